@@ -1,12 +1,153 @@
+import asyncio
+from functools import partial
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import service
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, SupportsResponse
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
 from .api import RemiAPI
-from .const import DOMAIN
+from .command_queue import RemiCommandQueue
+from .const import CONF_CACHE_DURATION, CONF_STALE_AFTER, DEFAULT_CACHE_DURATION, DEFAULT_STALE_AFTER, DOMAIN
+from .poller import KIND_EVENTS, RemiPoller
+from .snapshot import RemiSnapshot
+from .timeline import EventTimeline
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["light", "sensor", "switch", "number"]
+SERVICES = ["refresh_data", "get_next_events", "profile"]
+
+# Nouvelles tentatives de connexion après un démarrage depuis l'instantané (secondes)
+RESUME_RETRY_MIN = 30
+RESUME_RETRY_MAX = 600
+
+# Durée maximale d'un cycle de mise à jour pendant un profilage (2 x POLL_INTERVAL)
+PROFILE_CYCLE_TIMEOUT = 120
+
+REFRESH_DATA_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("entity_id"): cv.entity_ids,
+})
+
+GET_NEXT_EVENTS_SCHEMA = vol.Schema({
+    vol.Optional("device_id"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("count", default=5): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+})
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("cycles", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+})
+
+
+def _store_bedtime_settings(hass: HomeAssistant, bedtime_settings):
+    """Store the bedtime settings and re-index the devices whose Events changed."""
+    hass.data[DOMAIN]["bedtime_settings"] = bedtime_settings
+    timeline = hass.data[DOMAIN]["timeline"]
+    for remi_id, settings in bedtime_settings.items():
+        timeline.update_device(remi_id, settings)
+
+
+def _store_device_events(hass: HomeAssistant, remi_id, settings):
+    """Store the Events of one device after a poller refresh."""
+    hass.data[DOMAIN]["bedtime_settings"][remi_id] = settings
+    hass.data[DOMAIN]["timeline"].update_device(remi_id, settings)
+    hass.data[DOMAIN]["snapshot"].update_events(remi_id, settings)
+
+
+async def _async_fetch_devices(api):
+    """Fetch the info of every Rémi device of the account."""
+    devices = []
+    for remi_id in api.remis:
+        try:
+            device_info = await api.get_remi_info(remi_id, use_cache=True)
+            device_info["objectId"] = remi_id  # Ajouter l'ID à l'objet
+            devices.append(device_info)
+        except Exception as e:
+            _LOGGER.error("Failed to fetch device info for Remi ID %s: %s", remi_id, e)
+    return devices
+
+
+async def _async_fetch_bedtime_settings(api):
+    """Fetch the bedtime settings of every device, or none if the cloud fails."""
+    try:
+        bedtime_settings = await api.get_all_bedtime_settings(use_cache=True)
+        _LOGGER.info("Loaded bedtime settings for %d devices", len(bedtime_settings))
+        return bedtime_settings
+    except Exception as e:
+        _LOGGER.warning("Failed to load bedtime settings: %s", e)
+        return {}
+
+
+def _find_duplicate(hass: HomeAssistant, entry: ConfigEntry):
+    """Return the entry that already holds this entry's account, or None.
+
+    Of several entries for the same username, the one with a unique ID wins,
+    otherwise the oldest one.
+    """
+    username = entry.data["username"].lower()
+    same_account = [
+        other for other in hass.config_entries.async_entries(DOMAIN)
+        if other.data.get("username", "").lower() == username
+    ]
+    kept = next((other for other in same_account if other.unique_id is not None), same_account[0])
+    return None if kept.entry_id == entry.entry_id else kept
+
+
+def _adopt_unique_id(hass: HomeAssistant, entry: ConfigEntry, api):
+    """Give an entry created before unique IDs existed its account's Parse user ID."""
+    if entry.unique_id is not None or api.user_id is None:
+        return
+    if any(other.unique_id == api.user_id for other in hass.config_entries.async_entries(DOMAIN)):
+        return
+    hass.config_entries.async_update_entry(entry, unique_id=api.user_id)
+
+
+async def _async_resume(hass: HomeAssistant, entry: ConfigEntry, api, poller):
+    """Log in and refresh every restored device in the background, then start polling."""
+    restored_remis = list(api.remis)
+    delay = RESUME_RETRY_MIN
+    while True:
+        try:
+            await api.login()
+            break
+        except Exception as e:
+            _LOGGER.warning("Rémi cloud unavailable, keeping restored state (retry in %ds): %s", delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RESUME_RETRY_MAX)
+
+    _adopt_unique_id(hass, entry, api)
+
+    if set(api.remis) != set(restored_remis):
+        _LOGGER.info("Rémi devices changed since the last snapshot, reloading")
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+        return
+
+    results = await asyncio.gather(
+        *(poller.async_refresh(remi_id, events=True) for remi_id in api.remis),
+        return_exceptions=True,
+    )
+    for remi_id, result in zip(api.remis, results):
+        if isinstance(result, Exception):
+            _LOGGER.warning("Failed to refresh restored Remi %s: %s", remi_id, result)
+    hass.data[DOMAIN]["snapshot"].update_capabilities(api.capabilities)
+    await poller.run()
+
+
+def _remi_ids_from_devices(hass: HomeAssistant, device_ids):
+    """Translate Home Assistant device ids into Rémi objectIds."""
+    device_registry = dr.async_get(hass)
+    remi_ids = []
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+        if device is None:
+            continue
+        remi_ids.extend(ident for domain, ident in device.identifiers if domain == DOMAIN)
+    return remi_ids
+
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the Remi integration."""
     if DOMAIN not in hass.data:
@@ -18,64 +159,225 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     if DOMAIN not in hass.data:
         hass.data[DOMAIN] = {}
 
-    # Créez une instance de l'API
-    api = RemiAPI(entry.data["username"], entry.data["password"])
-    await api.login()
+    # Un compte ajouté deux fois avant l'identifiant unique doublerait toutes les requêtes
+    duplicate = _find_duplicate(hass, entry)
+    if duplicate is not None:
+        _LOGGER.error(
+            "Rémi account %s is already configured by entry %s, remove this duplicate entry",
+            entry.data["username"], duplicate.title,
+        )
+        return False
+
+    # Reprendre le client conservé lors d'un rechargement, avec ses caches et son jeton
+    api = hass.data[DOMAIN].setdefault("warm_api", {}).pop(entry.entry_id, None)
+    if api is None or (api.username, api.password) != (entry.data["username"], entry.data["password"]):
+        # Créez une instance de l'API
+        api = RemiAPI(entry.data["username"], entry.data["password"])
+    if "session_token" in entry.data:
+        # Première mise en place : reprendre la connexion du config flow, une seule fois
+        if api.session_token is None:
+            api.session_token = entry.data["session_token"]
+            api.remis = entry.data["remis"]
+        hass.config_entries.async_update_entry(entry, data={
+            key: value for key, value in entry.data.items() if key not in ("session_token", "remis")
+        })
+    api.cache_duration = entry.options.get(CONF_CACHE_DURATION, DEFAULT_CACHE_DURATION)
     hass.data[DOMAIN]["api"] = api
+    # Options en vigueur, pour ne recharger l'entrée que lorsqu'elles changent
+    hass.data[DOMAIN]["options"] = dict(entry.options)
 
-    # Récupérer et stocker les détails de tous les appareils Rémi
-    devices = []
-    for remi_id in api.remis:
+    snapshot = RemiSnapshot(hass, entry.entry_id)
+    hass.data[DOMAIN]["snapshot"] = snapshot
+    stored = await snapshot.async_load()
+    if api.capabilities is None:
+        api.capabilities = snapshot.capabilities
+    # Commandes restées en attente pendant une coupure du cloud
+    command_queue = RemiCommandQueue(hass, entry.entry_id, api)
+    await command_queue.async_load()
+    api.command_queue = command_queue
+    if api.session_token is not None:
+        # Rechargement à chaud : les caches du client sont plus récents que l'instantané
+        stored = None
+
+    if stored is not None:
+        # Créer les entités tout de suite depuis le dernier état connu ; le cloud est interrogé en arrière-plan
+        api.remis = stored["remis"]
+        api.faces = stored["faces"]
+        api.face_id_to_name = {face_id: name for name, face_id in api.faces.items()}
+        devices = [{**device, "restored": True} for device in stored["devices"].values()]
+        bedtime_settings = stored["bedtime_settings"]
+        _LOGGER.info("Restored %d Remi devices from the last snapshot", len(devices))
+    else:
         try:
-            device_info = await api.get_remi_info(remi_id)
-            device_info["objectId"] = remi_id  # Ajouter l'ID à l'objet
-            devices.append(device_info)
+            if api.session_token is None:
+                await api.login()
+            elif not api.faces:
+                await api.get_faces()
         except Exception as e:
-            _LOGGER.error("Failed to fetch device info for Remi ID %s: %s", remi_id, e)
+            # Chaque nouvel essai crée son propre client : fermer sa session HTTP
+            await api.close()
+            raise ConfigEntryNotReady(f"Login to the Rémi cloud failed: {e}") from e
+        _adopt_unique_id(hass, entry, api)
+        # Récupérer et stocker les détails de tous les appareils Rémi
+        devices = await _async_fetch_devices(api)
+        bedtime_settings = await _async_fetch_bedtime_settings(api)
+        snapshot.update(api, devices, bedtime_settings)
+        snapshot.update_capabilities(api.capabilities)
 
     hass.data[DOMAIN]["devices"] = devices
+    hass.data[DOMAIN]["timeline"] = EventTimeline()
+    _store_bedtime_settings(hass, bedtime_settings)
 
-    # Load bedtime settings for all devices
-    try:
-        bedtime_settings = await api.get_all_bedtime_settings()
-        hass.data[DOMAIN]["bedtime_settings"] = bedtime_settings
-        _LOGGER.info("Loaded bedtime settings for %d devices", len(bedtime_settings))
-    except Exception as e:
-        _LOGGER.warning("Failed to load bedtime settings: %s", e)
-        hass.data[DOMAIN]["bedtime_settings"] = {}
+    # Le poller rafraîchit chaque appareil à son propre décalage dans l'intervalle
+    poller = RemiPoller(api, stale_after=entry.options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER) * 3600)
+    hass.data[DOMAIN]["poller"] = poller
+    for remi_id in api.remis:
+        entry.async_on_unload(poller.async_add_listener(
+            remi_id,
+            lambda settings, remi_id=remi_id: _store_device_events(hass, remi_id, settings),
+            KIND_EVENTS,
+        ))
+        entry.async_on_unload(poller.async_add_listener(remi_id, partial(snapshot.update_device, remi_id)))
 
     # Forward setup to the light, sensor, switch, and number platforms
-    await hass.config_entries.async_forward_entry_setups(entry, ["light", "sensor", "switch", "number"])
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if stored is not None:
+        entry.async_create_background_task(hass, _async_resume(hass, entry, api, poller), "remi_resume")
+    else:
+        entry.async_create_background_task(hass, poller.run(), "remi_poller")
+    entry.async_create_background_task(hass, command_queue.run(), "remi_command_queue")
     
     # Register refresh service
     async def async_refresh_remi_data(call):
-        """Refresh all Remi data from the API."""
-        _LOGGER.info("Refreshing Remi data...")
+        """Refresh the targeted Remi devices, or all of them, with one bulk request."""
+        remi_ids = set(_remi_ids_from_devices(hass, call.data.get("device_id", [])))
+        for entity_id in call.data.get("entity_id", []):
+            remi_id = poller.device_for_entity(entity_id)
+            if remi_id is None:
+                _LOGGER.warning("%s is not a Rémi entity, ignoring it", entity_id)
+            else:
+                remi_ids.add(remi_id)
+        if not call.data.get("device_id") and not call.data.get("entity_id"):
+            remi_ids = set(api.remis)
+        if not remi_ids:
+            return
+
+        _LOGGER.info("Refreshing %d Remi device(s)...", len(remi_ids))
         try:
-            # Reload bedtime settings
-            bedtime_settings = await api.get_all_bedtime_settings()
-            hass.data[DOMAIN]["bedtime_settings"] = bedtime_settings
-            _LOGGER.info("Refreshed bedtime settings for %d devices", len(bedtime_settings))
-            
-            # Use Home Assistant's built-in service to refresh all Remi entities
-            # Get all Remi entities from the entity registry
-            entity_registry = await hass.helpers.entity_registry.async_get_registry()
-            remi_entities = []
-            for entity_id, entity in entity_registry.entities.items():
-                if entity.platform == DOMAIN:
-                    remi_entities.append(entity_id)
-            
-            if remi_entities:
-                await hass.services.async_call("homeassistant", "update_entity", {
-                    "entity_id": remi_entities
-                })
-                _LOGGER.info("Triggered update for %d Remi entities", len(remi_entities))
-            
-            _LOGGER.info("Successfully refreshed all Remi data and triggered entity updates")
-            
+            await poller.async_refresh_many(remi_ids)
         except Exception as e:
             _LOGGER.error("Failed to refresh Remi data: %s", e)
-    
-    hass.services.async_register(DOMAIN, "refresh_data", async_refresh_remi_data)
+
+    hass.services.async_register(
+        DOMAIN, "refresh_data", async_refresh_remi_data, schema=REFRESH_DATA_SCHEMA
+    )
+
+    async def async_get_next_events(call):
+        """Return the next upcoming Events, optionally limited to some devices."""
+        timeline = hass.data[DOMAIN]["timeline"]
+        now = dt_util.now()
+        count = call.data["count"]
+        if "device_id" in call.data:
+            events = []
+            for remi_id in _remi_ids_from_devices(hass, call.data["device_id"]):
+                events.extend(timeline.next_events(now, count, remi_id))
+            events = sorted(events, key=lambda event: event["time"])[:count]
+        else:
+            events = timeline.next_events(now, count)
+        # device_id : identifiant Home Assistant, réutilisable comme cible du service
+        device_registry = dr.async_get(hass)
+        ha_device_ids = {}
+        for event in events:
+            remi_id = event["remi_id"]
+            if remi_id not in ha_device_ids:
+                device = device_registry.async_get_device(identifiers={(DOMAIN, remi_id)})
+                ha_device_ids[remi_id] = device.id if device else None
+        return {
+            "events": [
+                {**event, "device_id": ha_device_ids[event["remi_id"]], "time": event["time"].isoformat()}
+                for event in events
+            ]
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        "get_next_events",
+        async_get_next_events,
+        schema=GET_NEXT_EVENTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_profile(call):
+        """Profile the integration over a number of update cycles."""
+        cycles = call.data["cycles"]
+        _LOGGER.info("Profiling Rémi integration for %d update cycle(s)", cycles)
+        try:
+            report = await api.profiler.capture(poller.polled_devices, cycles, cycles * PROFILE_CYCLE_TIMEOUT)
+        except (RuntimeError, ValueError) as e:
+            # ValueError: another profiler is already active on the event loop
+            raise HomeAssistantError(f"Cannot profile Rémi integration: {e}") from e
+
+        path = hass.config.path(f"remi_profile_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.txt")
+
+        def _write_report():
+            with open(path, "w", encoding="utf-8") as report_file:
+                report_file.write(report)
+
+        await hass.async_add_executor_job(_write_report)
+        _LOGGER.info("Rémi profile written to %s", path)
+        return {"report": path, "phases": api.profiler.summary()}
+
+    hass.services.async_register(
+        DOMAIN,
+        "profile",
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_close_session(event):
+        """Close the HTTP session when Home Assistant stops."""
+        await api.close()
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_close_session))
     
     return True
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
+    """Reload the entry when its options change."""
+    if dict(entry.options) == hass.data[DOMAIN].get("options"):
+        # Mise à jour des données ou de l'identifiant unique de l'entrée
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Unload a Rémi config entry, keeping the client warm for a reload."""
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if not unload_ok:
+        return False
+
+    for service_name in SERVICES:
+        hass.services.async_remove(DOMAIN, service_name)
+
+    data = hass.data[DOMAIN]
+    api = data.pop("api")
+    data.pop("poller").stop()
+    for key in ("devices", "bedtime_settings", "timeline", "snapshot", "options"):
+        data.pop(key, None)
+    if api.command_queue is not None:
+        await api.command_queue.async_flush()
+        api.command_queue = None
+    await api.close()
+    if entry.disabled_by is None:
+        data.setdefault("warm_api", {})[entry.entry_id] = api
+    return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Forget the warm client, the snapshot and the queued commands of a removed config entry."""
+    hass.data.get(DOMAIN, {}).get("warm_api", {}).pop(entry.entry_id, None)
+    await RemiSnapshot(hass, entry.entry_id).async_remove()
+    await RemiCommandQueue(hass, entry.entry_id, None).async_remove()
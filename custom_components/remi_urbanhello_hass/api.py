@@ -1,8 +1,50 @@
 import aiohttp
+import asyncio
 import logging
+import time
+from urllib.parse import urlparse
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    from json import loads as json_loads
+
+from .fade import FadeEngine
+from .profiler import RemiProfiler
+from .scheduler import PRIORITY_INTERACTIVE, PRIORITY_POLL, RequestScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
+APPLICATION_ID = "jf1a0bADt5fq"
+INVALID_SESSION_TOKEN = 209
+
+# Champs réellement lus par les parseurs, envoyés comme projection Parse "keys"
+REMI_KEYS = "temp,luminosity,volume,firmware_need_update,current_firmware_version,face,name"
+EVENT_KEYS = "name,event_time,enabled,recurrence,cmd,brightness,volume,length_min,face,lightnight"
+FACE_KEYS = "name"
+DEFAULT_PAGE_SIZE = 100
+# Erreurs indiquant que le cloud est injoignable (et non qu'il a refusé la requête)
+UNREACHABLE_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+# Limite Parse d'une requête ; au-delà les Events d'un lot sont relus page par page
+MAX_QUERY_LIMIT = 1000
+# Durée maximale d'une requête, pour qu'une connexion bloquée n'occupe pas un créneau du scheduler (secondes)
+REQUEST_TIMEOUT = 30
+# Classes de réglages sondées une fois par compte, puis relues rarement (secondes)
+PROBED_CLASSES = ("Event", "Alarm", "Schedule")
+CAPABILITY_MAX_AGE = 7 * 24 * 3600
+
+
+class RemiAPIError(Exception):
+    """Error returned by the Parse backend, with the HTTP status."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def _remi_pointer(object_id):
+    return {"__type": "Pointer", "className": "Remi", "objectId": object_id}
+
 
 class RemiAPI:
     BASE_URL = "https://remi2.urbanhello.com/parse"
@@ -11,115 +53,416 @@ class RemiAPI:
         self.username = username
         self.password = password
         self.session_token = None
+        self.user_id = None  # objectId de l'utilisateur Parse, identifiant unique du compte
         self.remis = []
         self.cache = {}  # Stocke les données pour chaque Remi
         self.cache_expiry = {}  # Stocke l'heure d'expiration du cache
         self.cache_duration = 60  # Durée de vie du cache en secondes
         self.faces = {}  # Stocke les faces disponibles par nom
-
-    async def login(self):
-        """Authenticate with the Rémi API and retrieve available devices."""
-        url = f"{self.BASE_URL}/login"
-        payload = {"username": self.username, "password": self.password}
+        self.face_id_to_name = {}
+        self.page_size = DEFAULT_PAGE_SIZE  # Taille des pages pour les requêtes Parse
+        self.command_queue = None  # File des écritures en attente, voir RemiCommandQueue
+        self.capabilities = None  # Classes et champs pris en charge, voir probe_capabilities
+        self._probe_lock = asyncio.Lock()
+        self.scheduler = RequestScheduler()
+        self.profiler = RemiProfiler()
+        self.fader = FadeEngine(self)
+        self._generation = {}  # Incrémenté à chaque écriture pour ignorer les lectures périmées
+        self._relogin = None  # Login en cours pour renouveler un jeton expiré, partagé par les requêtes
+        self._session = None
+
+    def _get_session(self):
+        """Return the shared HTTP session, opening it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            )
+        return self._session
+
+    async def close(self):
+        """Stop running fades and close the HTTP session; caches and session token are kept."""
+        self.fader.cancel_all()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _headers(self):
         headers = {
-            "x-parse-application-id": "jf1a0bADt5fq",
+            "x-parse-application-id": APPLICATION_ID,
             "content-type": "application/json",
         }
+        if self.session_token:
+            headers["x-parse-session-token"] = self.session_token
+        return headers
+
+    async def _request(self, method, path, payload=None, params=None,
+                       priority=PRIORITY_POLL, key=None):
+        """Send an authenticated request and return its status and decoded body.
+
+        The request goes through the account's scheduler with the given
+        priority; requests sharing a ``key`` are coalesced. An expired session
+        token is renewed once with a new login.
+        """
+        for attempt in range(2):
+            token = self.session_token
+            status, data = await self.scheduler.run(
+                lambda: self._send(method, path, payload, params), priority, key
+            )
+            if (
+                status != 200
+                and attempt == 0
+                and isinstance(data, dict)
+                and data.get("code") == INVALID_SESSION_TOKEN
+            ):
+                await self._renew_session(token)
+                continue
+            return status, data
+
+    async def _send(self, method, path, payload, params):
+        session = self._get_session()
+        with self.profiler.phase("network"):
+            async with session.request(
+                method,
+                f"{self.BASE_URL}/{path}",
+                json=payload,
+                params=params,
+                headers=self._headers(),
+            ) as response:
+                status = response.status
+                body = await response.read()
+        with self.profiler.phase("parse"):
+            return status, json_loads(body) if body else None
+
+    async def iter_query(self, class_name, where=None, keys=None, convert=None,
+                         cursor="objectId", page_size=None):
+        """Yield the results of a Parse query one page at a time.
+
+        Pages are walked with a ``$gt`` cursor on ``objectId``, or on
+        ``createdAt`` with ``objectId`` breaking ties, instead of ``skip``, so
+        results are complete whatever the account size. The cursor is ANDed
+        with the caller's ``where``. When ``convert`` is given each result is
+        converted as its page arrives and results converted to None are dropped.
+        """
+        page_size = page_size or self.page_size
+        order = "objectId" if cursor == "objectId" else f"{cursor},objectId"
+        if keys and cursor != "objectId":
+            keys = f"{keys},{cursor}"
+        last = None
+        while True:
+            page_where = dict(where or {})
+            if last is not None:
+                after = self._after(cursor, last)
+                page_where = {"$and": [page_where, after]} if page_where else after
+            payload = {"where": page_where, "order": order, "limit": page_size, "_method": "GET"}
+            if keys:
+                payload["keys"] = keys
+
+            status, data = await self._request("POST", f"classes/{class_name}", payload)
+            if status != 200:
+                raise RemiAPIError(f"Failed to query {class_name}: {status}", status)
+            results = data.get("results", [])
+            if not results:
+                return
+            last = results[-1]
+
+            if convert is not None:
+                with self.profiler.phase("parse"):
+                    page = [item for item in map(convert, results) if item is not None]
+            else:
+                page = results
+            yield page
+            if len(results) < page_size:
+                return
+
+    @staticmethod
+    def _after(cursor, last):
+        """Return the where clause of the results following ``last`` in cursor order."""
+        if cursor == "objectId":
+            return {"objectId": {"$gt": last["objectId"]}}
+        value = {"__type": "Date", "iso": last[cursor]}
+        return {"$or": [
+            {cursor: {"$gt": value}},
+            {cursor: value, "objectId": {"$gt": last["objectId"]}},
+        ]}
+
+    async def query_all(self, class_name, **kwargs):
+        """Collect every page of a Parse query into a single list."""
+        items = []
+        async for page in self.iter_query(class_name, **kwargs):
+            items.extend(page)
+        return items
+
+    def _cache_get(self, key):
+        """Return a cached value if it has not expired yet."""
+        if key in self.cache and time.monotonic() < self.cache_expiry.get(key, 0):
+            return self.cache[key]
+        return None
+
+    def _cache_set(self, key, value):
+        self.cache[key] = value
+        self.cache_expiry[key] = time.monotonic() + self.cache_duration
+
+    def _prune(self):
+        """Drop expired cache entries and the state of devices no longer on the account."""
+        now = time.monotonic()
+        remis = set(self.remis)
+        for key in list(self.cache):
+            object_id = key[len("events_"):] if key.startswith("events_") else key
+            if object_id not in remis or now >= self.cache_expiry.get(key, 0):
+                self.cache.pop(key, None)
+                self.cache_expiry.pop(key, None)
+        for object_id in list(self._generation):
+            if object_id not in remis:
+                del self._generation[object_id]
+
+    def invalidate(self, object_id):
+        """Forget the cached device info of a Rémi after a write."""
+        self.cache.pop(object_id, None)
+        self.cache_expiry.pop(object_id, None)
+        self.scheduler.forget(f"remi_{object_id}")
+        self._generation[object_id] = self._generation.get(object_id, 0) + 1
+
+    async def _renew_session(self, token):
+        """Log in again after a request sent with ``token`` was refused.
+
+        Concurrent requests refused with the same token all wait for a single
+        login; a request refused after the token was already renewed just retries.
+        """
+        if self._relogin is None and self.session_token in (token, None):
+            _LOGGER.info("Session token expired, logging in again")
+            self.session_token = None
+            self._relogin = asyncio.ensure_future(self.login())
+            self._relogin.add_done_callback(self._relogin_done)
+        if self._relogin is not None:
+            await asyncio.shield(self._relogin)
+
+    def _relogin_done(self, task):
+        if self._relogin is task:
+            self._relogin = None
+
+    async def login(self, fetch_faces=True):
+        """Authenticate with the Rémi API and retrieve available devices.
+
+        ``fetch_faces=False`` only validates the credentials, e.g. from the config flow.
+        """
+        payload = {"username": self.username, "password": self.password}
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Login failed: {response.status}")
-                data = await response.json()
-                self.session_token = data["sessionToken"]
-                self.remis = data.get("remis", [])
-                _LOGGER.debug("Login successful, devices available: %s", self.remis)
-                # Récupérer les faces après le login
-                await self.get_faces()
-                return data
+        status, data = await self._request(
+            "POST", "login", payload, priority=PRIORITY_INTERACTIVE, key="login"
+        )
+        if status != 200:
+            raise Exception(f"Login failed: {status}")
+        self.session_token = data["sessionToken"]
+        self.user_id = data.get("objectId")
+        self.remis = data.get("remis", [])
+        _LOGGER.debug("Login successful, devices available: %s", self.remis)
+        self._prune()
+        # Récupérer les faces après le login
+        if fetch_faces:
+            await self.get_faces()
+        return data
 
     async def get_faces(self):
         """Retrieve available faces and their objectId."""
-        url = f"{self.BASE_URL}/classes/Face"
-        headers = {
-            "x-parse-session-token": self.session_token,
-            "x-parse-application-id": "jf1a0bADt5fq",
-            "content-type": "application/json",
-        }
-        payload = {"order": "index", "_method": "GET"}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to retrieve faces: {response.status}")
-                data = await response.json()
-
+        faces = {}
+        face_id_to_name = {}
+        async for page in self.iter_query("Face", keys=FACE_KEYS):
+            for face in page:
                 # Stocker les faces par nom pour un accès rapide
-                self.faces = {face["name"]: face["objectId"] for face in data.get("results", [])}
+                faces[face["name"]] = face["objectId"]
                 # Also keep reverse mapping for name lookup by id
-                self.face_id_to_name = {face["objectId"]: face["name"] for face in data.get("results", [])}
-                return self.faces
-
-    async def get_remi_info(self, object_id):
-        """Retrieve all information for a specific Rémi device."""
-        url = f"{self.BASE_URL}/classes/Remi/{object_id}"
-        headers = {
-            "x-parse-session-token": self.session_token,
-            "x-parse-application-id": "jf1a0bADt5fq",
-            "content-type": "application/json",
+                face_id_to_name[face["objectId"]] = face["name"]
+
+        self.faces = faces
+        self.face_id_to_name = face_id_to_name
+        return self.faces
+
+    async def probe_capabilities(self):
+        """Find which settings classes the backend serves, and their fields."""
+        classes = {}
+        fields = {}
+        for class_name in PROBED_CLASSES:
+            payload = {"limit": 1, "_method": "GET"}
+            status, data = await self._request("POST", f"classes/{class_name}", payload)
+            if status == 200:
+                classes[class_name] = True
+                results = data.get("results", [])
+                if results:
+                    fields[class_name] = sorted(results[0])
+            elif status in (400, 404):
+                classes[class_name] = False
+            else:
+                raise RemiAPIError(f"Failed to probe {class_name}: {status}", status)
+        _LOGGER.info("Rémi backend capabilities: %s", classes)
+        return {"classes": classes, "fields": fields, "probed_at": time.time()}
+
+    async def get_capabilities(self):
+        """Return the backend capabilities, probing them once when unknown or too old."""
+        async with self._probe_lock:
+            if (
+                self.capabilities is None
+                or time.time() - self.capabilities.get("probed_at", 0) > CAPABILITY_MAX_AGE
+            ):
+                self.capabilities = await self.probe_capabilities()
+        return self.capabilities
+
+    async def _require_class(self, class_name):
+        capabilities = await self.get_capabilities()
+        if not capabilities["classes"].get(class_name):
+            raise RemiAPIError(f"The Rémi backend does not provide the {class_name} class")
+
+    async def get_remi_info(self, object_id, use_cache=False):
+        """Retrieve all information for a specific Rémi device.
+
+        The cache is only meant for setup and warm reloads; polls must read the cloud.
+        """
+        if use_cache:
+            cached = self._cache_get(object_id)
+            if cached is not None:
+                return dict(cached)
+        generation = self._generation.get(object_id, 0)
+
+        status, data = await self._request(
+            "GET", f"classes/Remi/{object_id}", params={"keys": REMI_KEYS},
+            key=f"remi_{object_id}",
+        )
+        if status != 200:
+            raise Exception(f"Failed to retrieve Remi info: {status}")
+        info = self._parse_remi(data)
+        self.profiler.record_refresh(object_id)
+        if self._generation.get(object_id, 0) == generation:
+            self._cache_set(object_id, info)
+        return dict(info)
+
+    def _parse_remi(self, data):
+        """Convert a Remi object to the device info used by the entities."""
+        face_id = None
+        face_obj = data.get("face")
+        if isinstance(face_obj, dict):
+            face_id = face_obj.get("objectId")
+        return {
+            "temperature": data.get("temp", 0) + 40,
+            "luminosity": data.get("luminosity", 0),
+            "volume": data.get("volume", 0),
+            "firmware_need_update": data.get("firmware_need_update", 0),
+            "current_firmware_version": data.get("current_firmware_version"),
+            "face": face_id,
+            "face_name": self.face_id_to_name.get(face_id),
+            "name": data.get("name"),
+            "updated_at": data.get("updatedAt"),
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to retrieve Remi info: {response.status}")
-                data = await response.json()
-                face_id = None
-                face_obj = data.get("face")
-                if isinstance(face_obj, dict):
-                    face_id = face_obj.get("objectId")
-                return {
-                    "temperature": data.get("temp", 0) + 40,
-                    "luminosity": data.get("luminosity", 0),
-                    "volume": data.get("volume", 0),
-                    "firmware_need_update": data.get("firmware_need_update", 0),
-                    "current_firmware_version": data.get("current_firmware_version"),
-                    "face": face_id,
-                    "face_name": getattr(self, "face_id_to_name", {}).get(face_id),
-                    "name": data.get("name"),
-                }
+    async def get_devices_bulk(self, object_ids):
+        """Fetch the info and Events of several devices in one batch request.
+
+        Returns ``(infos, settings)``, two dicts keyed by device objectId.
+        Devices missing from the response are missing from ``infos``.
+        """
+        await self._require_class("Event")
+        object_ids = list(object_ids)
+        mount = urlparse(self.BASE_URL).path
+        requests = [
+            {
+                "method": "GET",
+                "path": f"{mount}/classes/Remi",
+                "body": {
+                    "where": {"objectId": {"$in": object_ids}},
+                    "keys": REMI_KEYS,
+                    "limit": len(object_ids),
+                },
+            },
+            {
+                "method": "GET",
+                "path": f"{mount}/classes/Event",
+                "body": {
+                    "where": {"remi": {"$in": [_remi_pointer(object_id) for object_id in object_ids]}},
+                    "keys": f"{EVENT_KEYS},remi",
+                    "limit": MAX_QUERY_LIMIT,
+                },
+            },
+        ]
+        generations = {object_id: self._generation.get(object_id, 0) for object_id in object_ids}
+        status, data = await self._request(
+            "POST", "batch", {"requests": requests}, priority=PRIORITY_INTERACTIVE
+        )
+        if status != 200:
+            raise RemiAPIError(f"Failed to refresh devices: {status}", status)
+        remi_item, event_item = data
+        if "success" not in event_item:
+            # Sans ses Events, un appareil paraîtrait n'en avoir aucun : ne rien renvoyer
+            raise RemiAPIError(f"Failed to refresh Events: {event_item.get('error')}", status)
+        if "success" not in remi_item:
+            # Les appareils absents de infos sont comptés en échec par le poller
+            _LOGGER.warning("Failed to refresh Remi devices: %s", remi_item.get("error"))
+        remi_result = remi_item.get("success") or {}
+        event_result = event_item["success"]
+
+        infos = {}
+        for remi in remi_result.get("results", []):
+            object_id = remi["objectId"]
+            infos[object_id] = self._parse_remi(remi)
+            self.profiler.record_refresh(object_id)
+            if self._generation.get(object_id, 0) == generations[object_id]:
+                self._cache_set(object_id, infos[object_id])
+
+        events = event_result.get("results", [])
+        if len(events) >= MAX_QUERY_LIMIT:
+            # Trop d'Events pour une seule requête : relire chaque appareil page par page
+            settings = {object_id: await self.get_bedtime_settings(object_id) for object_id in object_ids}
+            return infos, settings
+
+        settings = {object_id: [] for object_id in object_ids}
+        with self.profiler.phase("parse"):
+            for event in events:
+                object_id = (event.get("remi") or {}).get("objectId")
+                alarm = self.convert_event_to_alarm(event, object_id)
+                if object_id in settings and alarm:
+                    settings[object_id].append(alarm)
+        for object_id, alarms in settings.items():
+            self._cache_set(f"events_{object_id}", alarms)
+        return infos, settings
+
+    async def send_command(self, path, payload):
+        """Send a write with interactive priority and return its status and body."""
+        return await self._request("PUT", path, payload, priority=PRIORITY_INTERACTIVE)
+
+    async def _write(self, path, payload, action):
+        """Send a write, or queue it for replay when the cloud cannot be reached.
+
+        Writes are keyed by object and field, so a later write to the same
+        field replaces a queued one and a successful write drops it.
+        """
+        key = f"{path}/{','.join(sorted(payload))}"
+        try:
+            status, data = await self.send_command(path, payload)
+        except UNREACHABLE_ERRORS as e:
+            if self.command_queue is None:
+                raise
+            status, data = None, e
+        if status is None or status >= 500:
+            if self.command_queue is None:
+                raise Exception(f"Failed to {action}: {status}")
+            _LOGGER.warning("Rémi cloud unreachable (%s), queuing %s", data if status is None else status, action)
+            self.command_queue.add(key, path, payload)
+            return None
+        if self.command_queue is not None:
+            self.command_queue.discard(key)
+        if status != 200:
+            raise Exception(f"Failed to {action}: {status}")
+        return data
+
+    async def _update_remi(self, object_id, payload, action):
+        """Write fields of a Rémi device and drop its cached info."""
+        self.invalidate(object_id)
+        return await self._write(f"classes/Remi/{object_id}", payload, action)
 
     async def set_brightness(self, object_id, brightness):
         """Set the brightness of a specific Rémi device."""
-        url = f"{self.BASE_URL}/classes/Remi/{object_id}"
-        headers = {
-            "x-parse-session-token": self.session_token,
-            "x-parse-application-id": "jf1a0bADt5fq",
-            "content-type": "application/json",
-        }
-        payload = {"luminosity": brightness}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to set brightness: {response.status}")
-                return await response.json()
+        return await self._update_remi(object_id, {"luminosity": brightness}, "set brightness")
 
     async def set_volume(self, object_id, volume):
         """Set the speaker volume of a specific Rémi device (0-100)."""
-        url = f"{self.BASE_URL}/classes/Remi/{object_id}"
-        headers = {
-            "x-parse-session-token": self.session_token,
-            "x-parse-application-id": "jf1a0bADt5fq",
-            "content-type": "application/json",
-        }
-        payload = {"volume": volume}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to set volume: {response.status}")
-                return await response.json()
+        return await self._update_remi(object_id, {"volume": volume}, "set volume")
 
     async def turn_on(self, object_id):
         """Turn on the light using the sleepyFace."""
@@ -127,19 +470,8 @@ class RemiAPI:
         if not face_id:
             raise Exception("sleepyFace not found")
 
-        url = f"{self.BASE_URL}/classes/Remi/{object_id}"
-        headers = {
-            "x-parse-session-token": self.session_token,
-            "x-parse-application-id": "jf1a0bADt5fq",
-            "content-type": "application/json",
-        }
         payload = {"face": {"__type": "Pointer", "className": "Face", "objectId": face_id}}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to turn on: {response.status}")
-                return await response.json()
+        return await self._update_remi(object_id, payload, "turn on")
 
     async def turn_off(self, object_id):
         """Turn off the light using the awakeFace."""
@@ -147,60 +479,33 @@ class RemiAPI:
         if not face_id:
             raise Exception("awakeFace not found")
 
-        url = f"{self.BASE_URL}/classes/Remi/{object_id}"
-        headers = {
-            "x-parse-session-token": self.session_token,
-            "x-parse-application-id": "jf1a0bADt5fq",
-            "content-type": "application/json",
-        }
         payload = {"face": {"__type": "Pointer", "className": "Face", "objectId": face_id}}
+        return await self._update_remi(object_id, payload, "turn off")
 
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to turn off: {response.status}")
-                return await response.json()
-
-    async def get_bedtime_settings(self, object_id):
+    async def get_bedtime_settings(self, object_id, use_cache=False):
         """Retrieve bedtime/alarm settings for a specific Rémi device from Event class."""
-        try:
-            url = f"{self.BASE_URL}/classes/Event"
-            headers = {
-                "x-parse-session-token": self.session_token,
-                "x-parse-application-id": "jf1a0bADt5fq",
-                "content-type": "application/json",
-            }
-            payload = {
-                "where": {"remi": {"__type": "Pointer", "className": "Remi", "objectId": object_id}},
-                "_method": "GET"
-            }
+        cache_key = f"events_{object_id}"
+        if use_cache:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        await self._require_class("Event")
+        alarms = []
+        async for page in self.iter_bedtime_settings(object_id):
+            alarms.extend(page)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        results = data.get("results", [])
-                        _LOGGER.info("Found %d events for Remi device %s", len(results), object_id)
-                        
-                        # Convert Event objects to standardized alarm format
-                        alarms = []
-                        for event in results:
-                            alarm = self.convert_event_to_alarm(event, object_id)
-                            if alarm:
-                                alarms.append(alarm)
-                        
-                        _LOGGER.info("Converted %d events to alarms", len(alarms))
-                        # If no events found, return simulated alarms as fallback
-                        if not alarms:
-                            _LOGGER.info("No events found, using simulated alarms as fallback")
-                            return self.get_simulated_alarms(object_id)
-                        return alarms
-                    else:
-                        _LOGGER.warning("Failed to get events: %s", response.status)
-                        return self.get_simulated_alarms(object_id)
-        except Exception as e:
-            _LOGGER.error("Exception getting events: %s", e)
-            return self.get_simulated_alarms(object_id)
+        _LOGGER.debug("Converted %d events to alarms for Remi device %s", len(alarms), object_id)
+        self._cache_set(cache_key, alarms)
+        return alarms
+
+    def iter_bedtime_settings(self, object_id):
+        """Stream the Events of a Rémi device as pages of converted alarms."""
+        return self.iter_query(
+            "Event",
+            where={"remi": _remi_pointer(object_id)},
+            keys=EVENT_KEYS,
+            convert=lambda event: self.convert_event_to_alarm(event, object_id),
+        )
 
     def convert_event_to_alarm(self, event, device_id):
         """Convert an Event object to a standardized alarm format."""
@@ -232,7 +537,7 @@ class RemiAPI:
                 "brightness": event.get("brightness", 100),
                 "volume": event.get("volume", 0),
                 "length_min": event.get("length_min", 0),
-                "remi": {"__type": "Pointer", "className": "Remi", "objectId": device_id},
+                "remi": _remi_pointer(device_id),
                 "face": event.get("face", {}),
                 "lightnight": event.get("lightnight", [255, 255, 255])
             }
@@ -242,102 +547,52 @@ class RemiAPI:
             _LOGGER.error("Failed to convert event to alarm: %s", e)
             return None
 
-    def get_simulated_alarms(self, object_id):
-        """Create simulated alarm data based on known alarm times as fallback."""
-        # These are the alarm times you mentioned from the app
-        alarm_times = ["06:45", "07:00", "09:00", "20:30", "21:00"]
-        
-        alarms = []
-        for i, time in enumerate(alarm_times):
-            alarm_obj = {
-                "objectId": f"{object_id}_simulated_alarm_{i}",
-                "name": f"Alarm {time}",
-                "time": time,
-                "enabled": True,
-                "days": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
-                "remi": {"__type": "Pointer", "className": "Remi", "objectId": object_id},
-                "simulated": True  # Mark as simulated
-            }
-            alarms.append(alarm_obj)
-        
-        _LOGGER.info("Created %d simulated alarms for device %s", len(alarms), object_id)
-        return alarms
-
     async def get_alarm_settings(self, object_id):
         """Retrieve alarm settings for a specific Rémi device."""
-        url = f"{self.BASE_URL}/classes/Alarm"
-        headers = {
-            "x-parse-session-token": self.session_token,
-            "x-parse-application-id": "jf1a0bADt5fq",
-            "content-type": "application/json",
-        }
-        payload = {
-            "where": {"remi": {"__type": "Pointer", "className": "Remi", "objectId": object_id}},
-            "_method": "GET"
-        }
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    # If Alarm class doesn't exist, try Schedule class
-                    if response.status == 400:
-                        return await self.get_schedule_settings(object_id)
-                    raise Exception(f"Failed to retrieve alarm settings: {response.status}")
-                data = await response.json()
-                return data.get("results", [])
+        capabilities = await self.get_capabilities()
+        # Lire directement la classe prise en charge par le serveur
+        if not capabilities["classes"].get("Alarm"):
+            return await self.get_schedule_settings(object_id)
+        try:
+            return await self.query_all("Alarm", where={"remi": _remi_pointer(object_id)})
+        except RemiAPIError as e:
+            raise Exception(f"Failed to retrieve alarm settings: {e.status}")
 
     async def get_schedule_settings(self, object_id):
         """Retrieve schedule settings for a specific Rémi device."""
-        url = f"{self.BASE_URL}/classes/Schedule"
-        headers = {
-            "x-parse-session-token": self.session_token,
-            "x-parse-application-id": "jf1a0bADt5fq",
-            "content-type": "application/json",
-        }
-        payload = {
-            "where": {"remi": {"__type": "Pointer", "className": "Remi", "objectId": object_id}},
-            "_method": "GET"
-        }
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to retrieve schedule settings: {response.status}")
-                data = await response.json()
-                return data.get("results", [])
+        await self._require_class("Schedule")
+        try:
+            return await self.query_all("Schedule", where={"remi": _remi_pointer(object_id)})
+        except RemiAPIError as e:
+            raise Exception(f"Failed to retrieve schedule settings: {e.status}")
 
     async def toggle_bedtime_setting(self, setting_id, enabled):
         """Toggle a bedtime/alarm setting on or off."""
-        # Check if this is a simulated alarm
-        if "simulated_alarm" in setting_id:
-            return await self.toggle_simulated_alarm(setting_id, enabled)
-        
         # Check if this is a device-extracted alarm (format: deviceId_alarm_index)
         if "_alarm_" in setting_id:
             return await self.toggle_device_alarm(setting_id, enabled)
         
         # Toggle Event object (real alarm)
         try:
-            url = f"{self.BASE_URL}/classes/Event/{setting_id}"
-            headers = {
-                "x-parse-session-token": self.session_token,
-                "x-parse-application-id": "jf1a0bADt5fq",
-                "content-type": "application/json",
-            }
             payload = {"enabled": enabled}
 
-            async with aiohttp.ClientSession() as session:
-                async with session.put(url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        _LOGGER.info("Successfully toggled event %s to %s", setting_id, enabled)
-                        return result
-                    else:
-                        raise Exception(f"Failed to toggle event: {response.status}")
+            result = await self._write(f"classes/Event/{setting_id}", payload, "toggle event")
+            _LOGGER.info("Toggled event %s to %s", setting_id, enabled)
+            self._update_cached_event(setting_id, enabled=enabled)
+            return result
         except Exception as e:
             _LOGGER.error("Failed to toggle event %s: %s", setting_id, e)
             raise e
 
+    def _update_cached_event(self, setting_id, **fields):
+        """Patch an Event in the cached settings lists so a warm reload stays accurate."""
+        for key, value in self.cache.items():
+            if not key.startswith("events_"):
+                continue
+            for alarm in value:
+                if alarm.get("objectId") == setting_id:
+                    alarm.update(fields)
+
     async def toggle_device_alarm(self, setting_id, enabled):
         """Toggle an alarm that was extracted from device data."""
         # For device-extracted alarms, we can't actually toggle them via API
@@ -345,23 +600,16 @@ class RemiAPI:
         _LOGGER.info("Toggle request for device alarm %s to %s (not implemented)", setting_id, enabled)
         return {"status": "acknowledged", "enabled": enabled}
 
-    async def toggle_simulated_alarm(self, setting_id, enabled):
-        """Toggle a simulated alarm."""
-        # For simulated alarms, we can't actually control the real device
-        # but we can acknowledge the request and log it
-        _LOGGER.info("Toggle request for simulated alarm %s to %s (simulated only)", setting_id, enabled)
-        return {"status": "acknowledged", "enabled": enabled, "simulated": True}
-
-    async def get_all_bedtime_settings(self):
+    async def get_all_bedtime_settings(self, use_cache=False):
         """Retrieve all bedtime/alarm settings for all Rémi devices."""
         all_settings = {}
         for remi_id in self.remis:
             try:
                 _LOGGER.info("Getting bedtime settings for Remi %s", remi_id)
-                settings = await self.get_bedtime_settings(remi_id)
-                _LOGGER.info("Retrieved %d settings for Remi %s: %s", len(settings), remi_id, settings)
+                settings = await self.get_bedtime_settings(remi_id, use_cache)
+                _LOGGER.debug("Retrieved %d settings for Remi %s: %s", len(settings), remi_id, settings)
                 all_settings[remi_id] = settings
             except Exception as e:
-                _LOGGER.warning("Failed to get bedtime settings for Remi %s: %s", remi_id, e)
+                _LOGGER.error("Failed to get bedtime settings for Remi %s: %s", remi_id, e)
                 all_settings[remi_id] = []
         return all_settings
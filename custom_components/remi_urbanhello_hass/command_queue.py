@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+
+from homeassistant.helpers.storage import Store
+from .api import UNREACHABLE_ERRORS
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Une commande plus ancienne n'a plus de sens une fois la connexion revenue (secondes)
+COMMAND_MAX_AGE = 3600
+# Délais entre deux tentatives de rejeu (secondes)
+REPLAY_RETRY_MIN = 15
+REPLAY_RETRY_MAX = 600
+
+
+class RemiCommandQueue:
+    """Writes that could not reach the cloud, persisted and replayed later.
+
+    Commands are keyed by object and field: a newer command to the same field
+    supersedes the queued one, so after an outage each field gets exactly one
+    write carrying its last requested value. Commands older than
+    COMMAND_MAX_AGE are dropped instead of replayed.
+    """
+
+    def __init__(self, hass, entry_id, api):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.commands")
+        self._api = api
+        self._commands = {}  # key -> {"path", "payload", "queued_at"}
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._commands)
+
+    async def async_load(self):
+        """Load the commands left over from a previous run."""
+        stored = await self._store.async_load()
+        self._commands = (stored or {}).get("commands", {})
+        if self._commands:
+            _LOGGER.info("%d Rémi command(s) waiting to be replayed", len(self._commands))
+            self._wakeup.set()
+
+    def add(self, key, path, payload):
+        """Queue a command, replacing any queued command for the same field."""
+        self._commands[key] = {"path": path, "payload": payload, "queued_at": time.time()}
+        self._save()
+        self._wakeup.set()
+
+    def discard(self, key):
+        """Drop the queued command for a field that was just written live."""
+        if self._commands.pop(key, None) is not None:
+            self._save()
+
+    def _save(self):
+        self._store.async_delay_save(lambda: {"commands": self._commands}, 1)
+
+    async def async_flush(self):
+        """Write the queue now, so a reload starts from the latest commands."""
+        await self._store.async_save({"commands": self._commands})
+
+    async def async_remove(self):
+        """Delete the queue of a removed entry."""
+        await self._store.async_remove()
+
+    async def run(self):
+        """Replay queued commands with backoff until cancelled."""
+        delay = REPLAY_RETRY_MIN
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._commands:
+                await asyncio.sleep(delay)
+                if await self._replay():
+                    delay = REPLAY_RETRY_MIN
+                else:
+                    delay = min(delay * 2, REPLAY_RETRY_MAX)
+
+    async def _replay(self):
+        """Replay the commands, oldest first; returns False if the cloud is still unreachable."""
+        now = time.time()
+        for key, command in sorted(self._commands.items(), key=lambda item: item[1]["queued_at"]):
+            if self._commands.get(key) is not command:
+                # Superseded or written live while replaying
+                continue
+            if now - command["queued_at"] > COMMAND_MAX_AGE:
+                _LOGGER.warning("Dropping Rémi command %s, queued too long ago", key)
+                self.discard(key)
+                continue
+            try:
+                status, _data = await self._api.send_command(command["path"], command["payload"])
+            except UNREACHABLE_ERRORS as e:
+                _LOGGER.debug("Rémi cloud still unreachable: %s", e)
+                return False
+            except Exception as e:
+                # E.g. the login renewing the session failed
+                _LOGGER.warning("Failed to replay Rémi command %s: %s", key, e)
+                return False
+            if status >= 500:
+                return False
+            if self._commands.get(key) is command:
+                self.discard(key)
+            if status == 200:
+                _LOGGER.info("Replayed Rémi command %s", key)
+                if command["path"].startswith("classes/Remi/"):
+                    self._api.invalidate(command["path"].rsplit("/", 1)[1])
+            else:
+                _LOGGER.error("Rémi command %s was rejected on replay: %s", key, status)
+        return True
@@ -1,7 +1,8 @@
 import logging
 from homeassistant import config_entries
+from homeassistant.core import callback
 from .api import RemiAPI
-from .const import DOMAIN
+from .const import CONF_CACHE_DURATION, CONF_STALE_AFTER, DEFAULT_CACHE_DURATION, DEFAULT_STALE_AFTER, DOMAIN
 import voluptuous as vol
 
 _LOGGER = logging.getLogger(__name__)
@@ -14,19 +15,21 @@ DATA_SCHEMA = vol.Schema({
 class RemiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow for this handler."""
+        return RemiOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         _LOGGER.debug("Starting config flow for Rémi")
         if user_input is not None:
             _LOGGER.debug("User input received: %s", user_input)
+            api = RemiAPI(user_input["username"], user_input["password"])
             try:
-                api = RemiAPI(user_input["username"], user_input["password"])
-                await api.login()
-                _LOGGER.debug("Login successful, creating entry")
-                return self.async_create_entry(
-                    title="Rémi Integration",
-                    data=user_input,
-                )
+                # Connexion légère : les faces seront récupérées par la mise en place de l'entrée
+                data = await api.login(fetch_faces=False)
             except Exception as e:
                 _LOGGER.error("Error during login: %s", e)
                 return self.async_show_form(
@@ -34,4 +37,45 @@ class RemiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     data_schema=DATA_SCHEMA,
                     errors={"base": "auth_failed"}
                 )
+            finally:
+                await api.close()
+
+            # Un compte ne peut être ajouté qu'une fois
+            await self.async_set_unique_id(data["objectId"])
+            self._abort_if_unique_id_configured()
+            _LOGGER.debug("Login successful, creating entry")
+            return self.async_create_entry(
+                title="Rémi Integration",
+                data={
+                    **user_input,
+                    # Transmis à la première mise en place pour éviter une seconde connexion
+                    "session_token": api.session_token,
+                    "remis": api.remis,
+                },
+            )
         return self.async_show_form(step_id="user", data_schema=DATA_SCHEMA)
+
+
+class RemiOptionsFlow(config_entries.OptionsFlow):
+    """Handle Rémi options; saving them hot-reloads the entry."""
+
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        schema = vol.Schema({
+            vol.Optional(
+                CONF_CACHE_DURATION,
+                default=self._entry.options.get(CONF_CACHE_DURATION, DEFAULT_CACHE_DURATION),
+            ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+            # Heures sans mise à jour avant de marquer une horloge hors ligne, 0 pour désactiver
+            vol.Optional(
+                CONF_STALE_AFTER,
+                default=self._entry.options.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=168)),
+        })
+        return self.async_show_form(step_id="init", data_schema=schema)
@@ -1,3 +1,17 @@
 
 DOMAIN = "remi"
-    
\ No newline at end of file
+CONF_CACHE_DURATION = "cache_duration"
+DEFAULT_CACHE_DURATION = 60
+CONF_STALE_AFTER = "stale_after"
+
+# Rafraîchissement des appareils, réparti sur l'intervalle (secondes)
+POLL_INTERVAL = 60
+# Les Events sont relus tous les N rafraîchissements d'un appareil
+EVENT_POLL_EVERY = 2
+# Échecs consécutifs avant de marquer un appareil indisponible
+FAILURE_THRESHOLD = 3
+# Délai maximal entre deux tentatives pour un appareil indisponible (secondes)
+MAX_BACKOFF = 3600
+# Un appareil dont l'objet Remi n'a pas changé depuis ce délai est considéré hors ligne (heures, 0 pour désactiver)
+# Volontairement long : une horloge inactive toute la nuit peut ne rien remonter pendant des heures
+DEFAULT_STALE_AFTER = 24
@@ -0,0 +1,66 @@
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+from .const import DOMAIN
+from .poller import KIND_AVAILABILITY, KIND_EVENTS, KIND_INFO
+
+
+class RemiEntity(Entity):
+    """Behaviour shared by every Rémi entity.
+
+    Entities do not poll: the integration's poller refreshes each device on its
+    own schedule and pushes the data to ``_apply_refresh(data)``, which every
+    platform entity defines to update itself from a device's info (or its
+    Events, with ``_listen_kind = KIND_EVENTS``). Entities created
+    from the startup snapshot are flagged ``restored`` until their first live
+    refresh.
+    """
+
+    _attr_should_poll = False
+    # Données du poller auxquelles l'entité s'abonne (infos de l'appareil ou Events)
+    _listen_kind = KIND_INFO
+    _poller = None
+    _restored = False
+
+    async def async_added_to_hass(self):
+        """Subscribe to the refreshes and availability of the entity's device."""
+        self._restored = bool(self._device.get("restored"))
+        self._poller = self.hass.data[DOMAIN]["poller"]
+        device_id = self._device["objectId"]
+        self.async_on_remove(
+            self._poller.async_add_listener(device_id, self._handle_refresh, self._listen_kind)
+        )
+        self.async_on_remove(
+            self._poller.async_add_listener(device_id, self._handle_availability, KIND_AVAILABILITY)
+        )
+        self.async_on_remove(self._poller.async_add_entity(self.entity_id, device_id))
+
+    @property
+    def available(self):
+        """Return False while the device is offline."""
+        return self._poller is None or self._poller.is_available(self._device["objectId"])
+
+    @callback
+    def _handle_availability(self, available):
+        self.async_write_ha_state()
+
+    @property
+    def extra_state_attributes(self):
+        """Flag state restored from the snapshot and not yet confirmed by the cloud."""
+        return {"restored": True} if self._restored else None
+
+    @callback
+    def _handle_refresh(self, data):
+        self._restored = False
+        self._apply_refresh(data)
+        self.async_write_ha_state()
+
+    async def async_update(self):
+        """Refresh the entity's device now, e.g. for homeassistant.update_entity."""
+        await self._poller.async_refresh(
+            self._device["objectId"], events=self._listen_kind == KIND_EVENTS
+        )
+
+    def async_write_ha_state(self):
+        """Write the state, timed as the entity_write phase when profiling."""
+        with self._api.profiler.phase("entity_write"):
+            super().async_write_ha_state()
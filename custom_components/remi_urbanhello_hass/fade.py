@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import math
+import time
+
+from .scheduler import TokenBucket
+
+_LOGGER = logging.getLogger(__name__)
+
+# Budget de requêtes du compte réservé aux fondus, partagé entre toutes les horloges
+FADE_REQUESTS_PER_SECOND = 2.0
+# Plus grand écart de luminosité (0-100) entre deux paliers qui reste fluide à l'œil
+MAX_SMOOTH_STEP = 5
+
+
+class FadeEngine:
+    """Run luminosity transitions for the clocks of one account.
+
+    Each fade is planned with the fewest steps that stay smooth, further
+    reduced so that all running fades together stay within the account's
+    request budget. Steps are time-based: a step sent late carries the value
+    due at that moment, so a fade that falls behind skips straight to the
+    latest value instead of replaying the backlog.
+    """
+
+    def __init__(self, api, rate=FADE_REQUESTS_PER_SECOND):
+        self._api = api
+        self._rate = rate
+        self.budget = TokenBucket(rate)
+        self._fades = {}  # device_id -> asyncio.Task
+        self._levels = {}  # device_id -> dernière luminosité envoyée par le fondu en cours
+
+    def level(self, device_id):
+        """Return the luminosity a running fade last sent to a device, or None when no fade runs."""
+        if device_id not in self._fades:
+            return None
+        return self._levels.get(device_id)
+
+    def plan_steps(self, start, target, duration):
+        """Return the number of luminosity writes for a fade."""
+        smooth = math.ceil(abs(target - start) / MAX_SMOOTH_STEP)
+        # The fade being planned is not in _fades yet, hence the + 1
+        affordable = int(duration * self._rate / (len(self._fades) + 1))
+        return max(1, min(smooth, affordable))
+
+    def start(self, device_id, start, target, duration, then=None):
+        """Fade a device from ``start`` to ``target`` luminosity over ``duration`` seconds.
+
+        A fade already running on the device is cancelled and replaced.
+        ``then`` is an optional coroutine function awaited once the target is reached.
+        """
+        self.cancel(device_id)
+        self._levels[device_id] = start
+        steps = self.plan_steps(start, target, duration)
+        _LOGGER.debug(
+            "Fading Remi %s from %s to %s over %.1fs in %d steps",
+            device_id, start, target, duration, steps,
+        )
+        task = asyncio.get_running_loop().create_task(
+            self._run(device_id, start, target, duration, steps, then)
+        )
+        self._fades[device_id] = task
+        task.add_done_callback(lambda done: self._forget(device_id, done))
+        return task
+
+    def cancel(self, device_id):
+        """Stop the fade running on a device, if any."""
+        task = self._fades.pop(device_id, None)
+        self._levels.pop(device_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+
+    def cancel_all(self):
+        """Stop every running fade."""
+        for device_id in list(self._fades):
+            self.cancel(device_id)
+
+    def _forget(self, device_id, task):
+        if self._fades.get(device_id) is task:
+            del self._fades[device_id]
+            self._levels.pop(device_id, None)
+
+    async def _run(self, device_id, start, target, duration, steps, then):
+        began = time.monotonic()
+        sent = start
+        try:
+            for step in range(1, steps + 1):
+                delay = began + duration * step / steps - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await self.budget.acquire()
+                progress = min(1.0, (time.monotonic() - began) / duration) if duration else 1.0
+                value = round(start + (target - start) * progress)
+                if value != sent:
+                    await self._api.set_brightness(device_id, value)
+                    sent = value
+                    self._levels[device_id] = value
+                if progress >= 1.0:
+                    break
+            if sent != target:
+                await self._api.set_brightness(device_id, target)
+                self._levels[device_id] = target
+            if then is not None:
+                await then()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _LOGGER.error("Fade of Remi %s stopped: %s", device_id, e)
@@ -1,13 +1,16 @@
-from datetime import timedelta
-from homeassistant.components.light import LightEntity, ColorMode, ATTR_BRIGHTNESS
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_TRANSITION,
+    ColorMode,
+    LightEntity,
+    LightEntityFeature,
+)
 from .const import DOMAIN
+from .entity import RemiEntity
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
-# Définir l'intervalle de mise à jour (1 minute)
-SCAN_INTERVAL = timedelta(minutes=1)
-
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Rémi lights based on a config entry."""
     api = hass.data[DOMAIN]["api"]
@@ -18,9 +21,9 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         _LOGGER.debug("Setting up light for device: %s", device)
         lights.append(RemiLight(api, device))
 
-    async_add_entities(lights, update_before_add=True)
+    async_add_entities(lights)
 
-class RemiLight(LightEntity):
+class RemiLight(RemiEntity, LightEntity):
     def __init__(self, api, device):
         self._api = api
         self._device = device
@@ -44,6 +47,7 @@ class RemiLight(LightEntity):
 
         # Use ColorMode for supported color modes
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
+        self._attr_supported_features = LightEntityFeature.TRANSITION
 
     @property
     def unique_id(self):
@@ -90,25 +94,44 @@ class RemiLight(LightEntity):
         # Convert brightness from 0-255 to 0-100 for the API
         api_brightness = min(int(brightness * 100 / 255), 100)
 
-        await self._api.set_brightness(self._id, api_brightness)
-        await self._api.turn_on(self._id)
+        transition = kwargs.get(ATTR_TRANSITION)
+        if transition:
+            # Fondu depuis le niveau atteint par un fondu en cours, sinon depuis la luminosité
+            # actuelle, ou depuis 0 si la lumière est éteinte
+            fading = self._api.fader.level(self._id)
+            start = fading if fading is not None else (self._brightness if self._is_on else 0)
+            if fading is None and not self._is_on:
+                # Éteindre la veilleuse avant de changer de face, sinon elle s'allume à son ancienne luminosité
+                self._api.fader.cancel(self._id)
+                await self._api.set_brightness(self._id, 0)
+                await self._api.turn_on(self._id)
+            self._api.fader.start(self._id, start, api_brightness, transition)
+        else:
+            self._api.fader.cancel(self._id)
+            await self._api.set_brightness(self._id, api_brightness)
+            await self._api.turn_on(self._id)
         self._is_on = True
         self._brightness = api_brightness
 
     async def async_turn_off(self, **kwargs):
         """Turn off the light."""
-        await self._api.set_brightness(self._id, 0)
-        await self._api.turn_off(self._id)
+        transition = kwargs.get(ATTR_TRANSITION)
+        if transition:
+            fading = self._api.fader.level(self._id)
+            start = fading if fading is not None else self._brightness
+            self._api.fader.start(
+                self._id, start, 0, transition, then=lambda: self._api.turn_off(self._id)
+            )
+        else:
+            self._api.fader.cancel(self._id)
+            await self._api.set_brightness(self._id, 0)
+            await self._api.turn_off(self._id)
         self._brightness = 0
         self._is_on = False
 
-    async def async_update(self):
-        """Fetch the latest light state and brightness from the API."""
-        try:
-            info = await self._api.get_remi_info(self._id)
-            self._brightness = info["luminosity"]
+    def _apply_refresh(self, info):
+        """Update the light state and brightness from the latest device info."""
+        self._brightness = info["luminosity"]
 
-            # Déterminer l'état en fonction de la face actuelle
-            self._is_on = info["face"] == self._face_on
-        except Exception as e:
-            _LOGGER.error("Failed to update light info for %s: %s", self._name, e)
+        # Déterminer l'état en fonction de la face actuelle
+        self._is_on = info["face"] == self._face_on
@@ -1,12 +1,10 @@
-from datetime import timedelta
 from homeassistant.components.number import NumberEntity
 from .const import DOMAIN
+from .entity import RemiEntity
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(minutes=1)
-
 async def async_setup_entry(hass, config_entry, async_add_entities):
     api = hass.data[DOMAIN]["api"]
     devices = hass.data[DOMAIN]["devices"]
@@ -16,15 +14,16 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         numbers.append(RemiLuminosityNumber(api, device))
         numbers.append(RemiVolumeNumber(api, device))
 
-    async_add_entities(numbers, update_before_add=True)
+    async_add_entities(numbers)
 
-class BaseRemiNumber(NumberEntity):
+class BaseRemiNumber(RemiEntity, NumberEntity):
     def __init__(self, api, device):
         self._api = api
         self._device = device
         self._device_id = device["objectId"]
         self._device_name = device.get("name", "Unknown Device")
         self._value = None
+        self._apply_refresh(device)
 
     @property
     def device_info(self):
@@ -62,15 +61,12 @@ class RemiLuminosityNumber(BaseRemiNumber):
         return f"{self._device_id}_luminosity_number"
 
     async def async_set_native_value(self, value: float) -> None:
+        self._api.fader.cancel(self._device_id)
         await self._api.set_brightness(self._device_id, int(value))
         self._value = int(value)
 
-    async def async_update(self):
-        try:
-            info = await self._api.get_remi_info(self._device_id)
-            self._value = int(info.get("luminosity", 0))
-        except Exception as e:
-            _LOGGER.error("Failed to update luminosity for %s: %s", self._device_name, e)
+    def _apply_refresh(self, info):
+        self._value = int(info.get("luminosity", 0))
 
 class RemiVolumeNumber(BaseRemiNumber):
     @property
@@ -85,11 +81,7 @@ class RemiVolumeNumber(BaseRemiNumber):
         await self._api.set_volume(self._device_id, int(value))
         self._value = int(value)
 
-    async def async_update(self):
-        try:
-            info = await self._api.get_remi_info(self._device_id)
-            self._value = int(info.get("volume", 0))
-        except Exception as e:
-            _LOGGER.error("Failed to update volume for %s: %s", self._device_name, e)
+    def _apply_refresh(self, info):
+        self._value = int(info.get("volume", 0))
 
 
@@ -0,0 +1,222 @@
+import asyncio
+from datetime import datetime
+import heapq
+import logging
+import time
+import zlib
+
+from .const import DEFAULT_STALE_AFTER, EVENT_POLL_EVERY, FAILURE_THRESHOLD, MAX_BACKOFF, POLL_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+KIND_INFO = "info"
+KIND_EVENTS = "events"
+KIND_AVAILABILITY = "availability"
+
+
+def _parse_timestamp(value):
+    """Return the POSIX timestamp of a Parse ISO date, or None."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class RemiPoller:
+    """Refresh every Rémi of an account and push the data to its entities.
+
+    Instead of every entity polling on the same tick, each device is refreshed
+    once per interval at a stable phase offset derived from its objectId, so
+    the requests of a large fleet are spread evenly over the interval. The
+    account's request scheduler caps how many of them run at once.
+
+    A device that keeps failing is marked unavailable once and then only
+    retried on an exponential backoff until it answers again. A device whose
+    Remi object has not changed for ``stale_after`` seconds (0 disables the
+    check) is also shown unavailable, but since the cloud still answers for
+    it, it keeps being polled normally.
+    """
+
+    def __init__(self, api, interval=POLL_INTERVAL, event_every=EVENT_POLL_EVERY,
+                 stale_after=DEFAULT_STALE_AFTER * 3600):
+        self._api = api
+        self.interval = interval
+        self.event_every = event_every
+        self.stale_after = stale_after
+        self._listeners = {}  # (kind, device_id) -> [callback]
+        self._cycles = {}  # device_id -> nombre de rafraîchissements
+        self._refreshing = {}  # device_id -> asyncio.Task
+        self._failures = {}  # device_id -> échecs consécutifs
+        self._skip = {}  # device_id -> tours à sauter pendant le backoff
+        self._unavailable = set()  # appareils en échec, interrogés avec backoff
+        self._stale = set()  # appareils sans mise à jour depuis stale_after
+        self._entities = {}  # entity_id -> device_id
+
+    def phase_offset(self, device_id):
+        """Return the stable offset, in seconds, of a device within the interval."""
+        return zlib.crc32(device_id.encode()) % 1000 / 1000 * self.interval
+
+    def _next_due(self, device_id, now):
+        due = now - now % self.interval + self.phase_offset(device_id)
+        return due if due > now else due + self.interval
+
+    def async_add_listener(self, device_id, callback, kind=KIND_INFO):
+        """Call ``callback`` with each refresh of a device; returns the remover."""
+        listeners = self._listeners.setdefault((kind, device_id), [])
+        listeners.append(callback)
+
+        def remove_listener():
+            listeners.remove(callback)
+            if not listeners:
+                self._listeners.pop((kind, device_id), None)
+
+        return remove_listener
+
+    def async_add_entity(self, entity_id, device_id):
+        """Index an entity under its device; returns the remover."""
+        self._entities[entity_id] = device_id
+        return lambda: self._entities.pop(entity_id, None)
+
+    def device_for_entity(self, entity_id):
+        """Return the device objectId of an indexed entity, or None."""
+        return self._entities.get(entity_id)
+
+    def is_available(self, device_id):
+        """Return False while a device is considered offline."""
+        return device_id not in self._unavailable and device_id not in self._stale
+
+    def polled_devices(self):
+        """Return the devices refreshed every interval, leaving out the offline ones retried on a backoff."""
+        return [device_id for device_id in self._api.remis if device_id not in self._unavailable]
+
+    def _notify_availability(self, device_id, was_available):
+        available = self.is_available(device_id)
+        if available != was_available:
+            self._notify(KIND_AVAILABILITY, device_id, available)
+
+    def _notify(self, kind, device_id, data):
+        for callback in list(self._listeners.get((kind, device_id), [])):
+            callback(data)
+
+    async def run(self):
+        """Refresh each device at its phase of every interval, until cancelled."""
+        now = time.time()
+        schedule = [(self._next_due(device_id, now), device_id) for device_id in self._api.remis]
+        heapq.heapify(schedule)
+        try:
+            while schedule:
+                due, device_id = schedule[0]
+                delay = due - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                heapq.heapreplace(schedule, (due + self.interval, device_id))
+                if self._skip.get(device_id):
+                    # Device offline: wait for the end of its backoff
+                    self._skip[device_id] -= 1
+                    continue
+                if device_id in self._refreshing:
+                    # Previous refresh still waiting on the cloud: skip this turn
+                    _LOGGER.debug("Refresh of Remi %s still running, skipping", device_id)
+                    continue
+                task = asyncio.get_running_loop().create_task(self._refresh_scheduled(device_id))
+                self._refreshing[device_id] = task
+                task.add_done_callback(lambda _task, dev=device_id: self._refreshing.pop(dev, None))
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Cancel the refreshes in flight."""
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._refreshing.clear()
+
+    async def _refresh_scheduled(self, device_id):
+        cycle = self._cycles.get(device_id, 0) + 1
+        self._cycles[device_id] = cycle
+        try:
+            await self.async_refresh(device_id, events=cycle % self.event_every == 0)
+        except Exception:
+            # Already accounted for by _record_failure
+            pass
+
+    async def async_refresh(self, device_id, events=False):
+        """Fetch a device's info, and optionally its Events, and push them."""
+        try:
+            info = await self._api.get_remi_info(device_id)
+        except Exception as e:
+            self._record_failure(device_id, e)
+            raise
+        self._push_info(device_id, info)
+        if events:
+            try:
+                alarms = await self._api.get_bedtime_settings(device_id)
+            except Exception as e:
+                _LOGGER.error("Failed to refresh Events of Remi %s: %s", device_id, e)
+                return
+            self._notify(KIND_EVENTS, device_id, alarms)
+
+    async def async_refresh_many(self, device_ids):
+        """Refresh the info and Events of several devices with one bulk request."""
+        device_ids = list(device_ids)
+        try:
+            infos, settings = await self._api.get_devices_bulk(device_ids)
+        except Exception as e:
+            for device_id in device_ids:
+                self._record_failure(device_id, e)
+            raise
+        for device_id in device_ids:
+            if device_id not in infos:
+                self._record_failure(device_id, "missing from the bulk refresh")
+                continue
+            self._push_info(device_id, infos[device_id])
+            self._notify(KIND_EVENTS, device_id, settings[device_id])
+
+    def _push_info(self, device_id, info):
+        was_available = self.is_available(device_id)
+        self._record_success(device_id)
+        updated_at = _parse_timestamp(info.get("updated_at"))
+        stale = (
+            self.stale_after > 0
+            and updated_at is not None
+            and time.time() - updated_at > self.stale_after
+        )
+        if stale and device_id not in self._stale:
+            self._stale.add(device_id)
+            _LOGGER.warning("Remi %s has not reported since %s, marking it offline", device_id, info["updated_at"])
+        elif not stale and device_id in self._stale:
+            self._stale.discard(device_id)
+            _LOGGER.info("Remi %s is reporting again", device_id)
+        self._notify_availability(device_id, was_available)
+        self._notify(KIND_INFO, device_id, info)
+
+    def _record_success(self, device_id):
+        self._failures.pop(device_id, None)
+        self._skip.pop(device_id, None)
+        if device_id in self._unavailable:
+            self._unavailable.discard(device_id)
+            _LOGGER.info("Remi %s is responding again", device_id)
+
+    def _record_failure(self, device_id, reason):
+        failures = self._failures.get(device_id, 0) + 1
+        self._failures[device_id] = failures
+        if failures < FAILURE_THRESHOLD:
+            _LOGGER.debug("Failed to refresh Remi %s (%d): %s", device_id, failures, reason)
+            return
+
+        # Backoff in whole intervals so the device keeps its phase offset
+        turns = min(2 ** min(failures - FAILURE_THRESHOLD, 16), max(1, MAX_BACKOFF // self.interval))
+        self._skip[device_id] = turns - 1
+        backoff = turns * self.interval
+        if device_id in self._unavailable:
+            _LOGGER.debug("Remi %s still offline, next try in %ds: %s", device_id, backoff, reason)
+            return
+        was_available = self.is_available(device_id)
+        self._unavailable.add(device_id)
+        _LOGGER.warning(
+            "Remi %s is offline after %d failed refreshes (%s), retrying with backoff",
+            device_id, failures, reason,
+        )
+        self._notify_availability(device_id, was_available)
@@ -0,0 +1,110 @@
+import asyncio
+import cProfile
+from contextlib import contextmanager
+import io
+import logging
+import os
+import pstats
+import re
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+PHASES = ("network", "parse", "entity_write")
+
+# Répertoire de l'intégration, pour ne garder que ses fonctions dans le rapport
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class RemiProfiler:
+    """Per-phase wall-clock timings and cProfile capture over update cycles.
+
+    Phases are only recorded while a capture is running, so the ``phase``
+    context manager costs a single attribute check the rest of the time.
+    An update cycle ends once every device still polled normally (not offline
+    and retried on a backoff) has been refreshed from the cloud.
+
+    cProfile cannot follow asyncio tasks: the capture covers everything
+    running on the event loop thread, and only the report is filtered down
+    to the integration's functions (their cumulative times include the
+    Home Assistant and aiohttp code they call).
+    """
+
+    def __init__(self):
+        self.active = False
+        self.timings = {}
+        self._devices = None  # callable returning the devices a cycle must cover
+        self._seen = set()
+        self._cycles_left = 0
+        self._done = None
+        self._profile = None
+
+    @contextmanager
+    def phase(self, name):
+        """Record the wall-clock time spent in a phase while capturing."""
+        if not self.active:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.setdefault(name, []).append(time.perf_counter() - start)
+
+    def record_refresh(self, device_id):
+        """Note that a device was refreshed; completes a cycle once all were."""
+        if not self.active:
+            return
+        self._seen.add(device_id)
+        if self._seen >= set(self._devices()):
+            self._seen = set()
+            self._cycles_left -= 1
+            if self._cycles_left <= 0:
+                self._done.set()
+
+    async def capture(self, devices, cycles, timeout):
+        """Profile ``cycles`` update cycles and return the text report.
+
+        ``devices`` is called at each refresh and returns the devices a cycle must cover.
+        """
+        if self.active:
+            raise RuntimeError("A Rémi profile is already running")
+        self.timings = {}
+        self._devices = devices
+        self._seen = set()
+        self._cycles_left = cycles
+        self._done = asyncio.Event()
+        self._profile = cProfile.Profile()
+        started = time.perf_counter()
+        self._profile.enable()
+        self.active = True
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+            completed = cycles
+        except asyncio.TimeoutError:
+            completed = cycles - self._cycles_left
+            _LOGGER.warning("Rémi profile timed out after %d of %d cycles", completed, cycles)
+        finally:
+            self.active = False
+            self._profile.disable()
+        return self._report(completed, time.perf_counter() - started)
+
+    def _report(self, cycles, elapsed):
+        out = io.StringIO()
+        out.write(f"Rémi integration profile: {cycles} update cycle(s) in {elapsed:.2f}s\n\n")
+        out.write(f"{'phase':<14}{'calls':>8}{'total s':>12}{'mean ms':>12}{'max ms':>12}\n")
+        for name in PHASES:
+            samples = self.timings.get(name, [])
+            total = sum(samples)
+            mean = total / len(samples) * 1000 if samples else 0.0
+            worst = max(samples) * 1000 if samples else 0.0
+            out.write(f"{name:<14}{len(samples):>8}{total:>12.4f}{mean:>12.2f}{worst:>12.2f}\n")
+        out.write("\nFunctions of the integration, by cumulative time:\n")
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(re.escape(PACKAGE_DIR), 40)
+        self._profile = None
+        return out.getvalue()
+
+    def summary(self):
+        """Return the total seconds spent in each phase during the last capture."""
+        return {name: round(sum(self.timings.get(name, [])), 4) for name in PHASES}
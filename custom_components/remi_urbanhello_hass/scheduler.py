@@ -0,0 +1,118 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Plus la valeur est petite, plus la requête est prioritaire
+PRIORITY_INTERACTIVE = 0
+PRIORITY_POLL = 1
+
+MAX_CONCURRENT_REQUESTS = 4
+
+
+class RequestScheduler:
+    """Cap concurrent requests of an account and serve them by priority.
+
+    Interactive requests (entity commands, service calls) are handed the next
+    free slot before any queued poll. Polls sharing a key are coalesced: a poll
+    that arrives while an identical one is queued or in flight waits for that
+    one's result instead of sending its own request.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_REQUESTS):
+        self.max_concurrent = max_concurrent
+        self._active = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._pending = {}  # key -> future of the request shared by coalesced callers
+
+    async def run(self, request, priority=PRIORITY_POLL, key=None):
+        """Run ``request()`` once a slot is free and return its result."""
+        if key is None:
+            return await self._run(request, priority)
+
+        shared = self._pending.get(key)
+        if shared is not None:
+            _LOGGER.debug("Coalescing request %s with the one already pending", key)
+            return await asyncio.shield(shared)
+
+        shared = asyncio.get_running_loop().create_future()
+        # Retrieve the exception when nobody else is waiting for it
+        shared.add_done_callback(lambda fut: fut.cancelled() or fut.exception())
+        self._pending[key] = shared
+        try:
+            result = await self._run(request, priority)
+        except asyncio.CancelledError:
+            shared.cancel()
+            raise
+        except Exception as err:
+            shared.set_exception(err)
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            if self._pending.get(key) is shared:
+                del self._pending[key]
+
+    def forget(self, key):
+        """Stop coalescing new requests with a pending one whose result is outdated."""
+        self._pending.pop(key, None)
+
+    async def _run(self, request, priority):
+        await self._acquire(priority)
+        try:
+            return await request()
+        finally:
+            self._release()
+
+    async def _acquire(self, priority):
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation
+                self._release()
+            raise
+
+    def _release(self):
+        while self._waiters:
+            _priority, _seq, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # Hand the slot over directly to the most urgent waiter
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+
+class TokenBucket:
+    """Request budget refilled at ``rate`` tokens per second, up to ``capacity``."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
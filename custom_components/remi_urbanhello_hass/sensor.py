@@ -1,6 +1,9 @@
 from datetime import timedelta
-from homeassistant.helpers.entity import Entity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.util import dt as dt_util
 from .const import DOMAIN
+from .entity import RemiEntity
+from .poller import KIND_EVENTS
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,10 +22,11 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         sensors.append(RemiFirmwareStatusSensor(api, device))
         sensors.append(RemiFirmwareVersionSensor(api, device))
         sensors.append(RemiFaceSensor(api, device))
+        sensors.append(RemiNextAlarmSensor(api, device))
 
-    async_add_entities(sensors, update_before_add=True)
+    async_add_entities(sensors)
 
-class RemiTemperatureSensor(Entity):
+class RemiTemperatureSensor(RemiEntity):
     """Representation of a Rémi temperature sensor."""
 
     def __init__(self, api, device):
@@ -31,6 +35,7 @@ class RemiTemperatureSensor(Entity):
         self._name = f"Rémi {device.get('name', 'Unknown Device')} temperature"
         self._id = device["objectId"]
         self._temperature = None
+        self._apply_refresh(device)
 
     @property
     def device_info(self):
@@ -63,21 +68,18 @@ class RemiTemperatureSensor(Entity):
         """Return the unit of measurement."""
         return "°C"
 
-    async def async_update(self):
-        """Fetch the latest temperature from the API."""
-        try:
-            info = await self._api.get_remi_info(self._id)
-            self._temperature = info["temperature"] / 10.0
-        except Exception as e:
-            _LOGGER.error("Failed to update temperature for %s: %s", self._name, e)
-
-class RemiFirmwareStatusSensor(Entity):
+    def _apply_refresh(self, info):
+        """Update the temperature from the latest device info."""
+        self._temperature = info["temperature"] / 10.0
+
+class RemiFirmwareStatusSensor(RemiEntity):
     def __init__(self, api, device):
         self._api = api
         self._device = device
         self._name = f"Rémi {device.get('name', 'Unknown Device')} firmware status"
         self._id = device["objectId"]
         self._state = None
+        self._apply_refresh(device)
 
     @property
     def name(self):
@@ -91,21 +93,18 @@ class RemiFirmwareStatusSensor(Entity):
     def state(self):
         return self._state
 
-    async def async_update(self):
-        try:
-            info = await self._api.get_remi_info(self._id)
-            need = info.get("firmware_need_update", 0)
-            self._state = "update-needed" if need else "up-to-date"
-        except Exception as e:
-            _LOGGER.error("Failed to update firmware status for %s: %s", self._name, e)
-
-class RemiFirmwareVersionSensor(Entity):
+    def _apply_refresh(self, info):
+        need = info.get("firmware_need_update", 0)
+        self._state = "update-needed" if need else "up-to-date"
+
+class RemiFirmwareVersionSensor(RemiEntity):
     def __init__(self, api, device):
         self._api = api
         self._device = device
         self._name = f"Rémi {device.get('name', 'Unknown Device')} firmware version"
         self._id = device["objectId"]
         self._state = None
+        self._apply_refresh(device)
 
     @property
     def name(self):
@@ -119,20 +118,17 @@ class RemiFirmwareVersionSensor(Entity):
     def state(self):
         return self._state
 
-    async def async_update(self):
-        try:
-            info = await self._api.get_remi_info(self._id)
-            self._state = info.get("current_firmware_version")
-        except Exception as e:
-            _LOGGER.error("Failed to update firmware version for %s: %s", self._name, e)
+    def _apply_refresh(self, info):
+        self._state = info.get("current_firmware_version")
 
-class RemiFaceSensor(Entity):
+class RemiFaceSensor(RemiEntity):
     def __init__(self, api, device):
         self._api = api
         self._device = device
         self._name = f"Rémi {device.get('name', 'Unknown Device')} face"
         self._id = device["objectId"]
         self._state = None
+        self._apply_refresh(device)
 
     @property
     def name(self):
@@ -146,10 +142,66 @@ class RemiFaceSensor(Entity):
     def state(self):
         return self._state
 
+    def _apply_refresh(self, info):
+        # Prefer face_name from API; fallback to id
+        self._state = info.get("face_name") or info.get("face") or "unknown"
+
+class RemiNextAlarmSensor(RemiEntity, SensorEntity):
+    """Timestamp of the next enabled Event of a Rémi clock."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    # Calculé localement depuis la timeline, sans requête réseau
+    _attr_should_poll = True
+    _listen_kind = KIND_EVENTS
+
+    def __init__(self, api, device):
+        self._api = api
+        self._device = device
+        self._name = f"Rémi {device.get('name', 'Unknown Device')} next alarm"
+        self._id = device["objectId"]
+        self._next_event = None
+
+    @property
+    def device_info(self):
+        """Return device information to link the entity to the integration."""
+        return {
+            "identifiers": {(DOMAIN, self._id)},
+            "name": f"Rémi {self._device.get('name', 'Unknown Device')}",
+            "manufacturer": "UrbanHello",
+            "model": "Rémi Clock",
+            "via_device": (DOMAIN, self._id),
+        }
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def unique_id(self):
+        return f"{self._id}_next_alarm"
+
+    @property
+    def native_value(self):
+        return self._next_event["time"] if self._next_event else None
+
+    @property
+    def extra_state_attributes(self):
+        if not self._next_event:
+            return super().extra_state_attributes
+        return {
+            "event_id": self._next_event["event_id"],
+            "event_name": self._next_event["name"],
+            **(super().extra_state_attributes or {}),
+        }
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._apply_refresh(None)
+
+    def _apply_refresh(self, alarms):
+        timeline = self.hass.data[DOMAIN]["timeline"]
+        self._next_event = timeline.next_event(self._id, dt_util.now())
+
     async def async_update(self):
-        try:
-            info = await self._api.get_remi_info(self._id)
-            # Prefer face_name from API; fallback to id
-            self._state = info.get("face_name") or info.get("face") or "unknown"
-        except Exception as e:
-            _LOGGER.error("Failed to update face for %s: %s", self._name, e)
+        """Read the next occurrence from the integration's Event timeline."""
+        self._apply_refresh(None)
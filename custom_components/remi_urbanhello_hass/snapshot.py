@@ -0,0 +1,84 @@
+import logging
+
+from homeassistant.helpers.storage import Store
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Regroupe les écritures successives en une seule toutes les N secondes
+SAVE_DELAY = 30
+
+
+class RemiSnapshot:
+    """Last known state of an account, persisted in Home Assistant storage.
+
+    It holds the device list, each device's info, its Events and the face
+    catalog, so entities can be created at startup before the cloud answers,
+    plus the backend capabilities found by the account's probe.
+    """
+
+    def __init__(self, hass, entry_id):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._data = {
+            "remis": [], "faces": {}, "devices": {}, "bedtime_settings": {}, "capabilities": None,
+        }
+        self._save_pending = False
+
+    @property
+    def capabilities(self):
+        """Return the persisted backend capabilities, or None."""
+        return self._data.get("capabilities")
+
+    async def async_load(self):
+        """Load the snapshot; returns None when nothing was saved yet."""
+        stored = await self._store.async_load()
+        if stored:
+            self._data.update(stored)
+        if not self._data["devices"]:
+            return None
+        return self._data
+
+    def update(self, api, devices, bedtime_settings):
+        """Replace the whole snapshot after a full sync."""
+        self._data = {
+            "remis": list(api.remis),
+            "faces": dict(api.faces),
+            "devices": {device["objectId"]: device for device in devices},
+            "bedtime_settings": dict(bedtime_settings),
+            "capabilities": self._data.get("capabilities"),
+        }
+        self._schedule_save()
+
+    def update_capabilities(self, capabilities):
+        """Record the backend capabilities when a probe found new ones."""
+        if capabilities is None or capabilities == self._data.get("capabilities"):
+            return
+        self._data["capabilities"] = capabilities
+        self._schedule_save()
+
+    def update_device(self, device_id, info):
+        """Record the latest info of a device."""
+        self._data["devices"][device_id] = {**info, "objectId": device_id}
+        self._schedule_save()
+
+    def update_events(self, device_id, settings):
+        """Record the latest Events of a device."""
+        self._data["bedtime_settings"][device_id] = settings
+        self._schedule_save()
+
+    def _schedule_save(self):
+        # async_delay_save relance son délai à chaque appel : avec un poll par minute
+        # l'instantané ne serait jamais écrit. Une seule écriture programmée à la fois.
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self):
+        self._save_pending = False
+        return self._data
+
+    async def async_remove(self):
+        """Delete the snapshot of a removed entry."""
+        await self._store.async_remove()
@@ -1,19 +1,23 @@
-from datetime import timedelta
+from functools import partial
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from .const import DOMAIN
+from .entity import RemiEntity
+from .poller import KIND_EVENTS
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
-# Define update interval (2 minutes for switches to catch changes faster)
-SCAN_INTERVAL = timedelta(minutes=2)
-
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Rémi bedtime/alarm switches based on a config entry."""
     api = hass.data[DOMAIN]["api"]
     devices = hass.data[DOMAIN]["devices"]
     bedtime_settings = hass.data[DOMAIN].get("bedtime_settings", {})
+    poller = hass.data[DOMAIN]["poller"]
 
+    # Switches enregistrés, par appareil puis par objectId d'Event
+    registered = {}
     switches = []
     
     for device in devices:
@@ -25,24 +29,69 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         
         # Log the settings for debugging
         for i, setting in enumerate(device_settings):
-            _LOGGER.info("Setting %d: %s", i, setting)
-        
-        # Create a switch for each bedtime setting
-        for setting in device_settings:
-            switch = RemiBedtimeSwitch(api, device, setting)
-            switches.append(switch)
+            _LOGGER.debug("Setting %d: %s", i, setting)
         
-        # If no settings found, create a placeholder switch
-        if not device_settings:
-            _LOGGER.warning("No bedtime settings found for device %s, creating placeholder", device_name)
-            placeholder_switch = RemiBedtimeSwitch(api, device, None)
-            switches.append(placeholder_switch)
-
-    async_add_entities(switches, update_before_add=True)
-
-class RemiBedtimeSwitch(SwitchEntity):
+        registered[device_id] = _create_switches(api, device, device_settings)
+        switches.extend(registered[device_id].values())
+
+        config_entry.async_on_unload(poller.async_add_listener(
+            device_id,
+            partial(_sync_switches, hass, api, device, registered[device_id], async_add_entities),
+            KIND_EVENTS,
+        ))
+
+    async_add_entities(switches)
+
+
+def _create_switches(api, device, settings):
+    """Create a switch for each bedtime setting, or a placeholder if there is none."""
+    # Create a switch for each bedtime setting
+    switches = {setting.get("objectId", "unknown"): RemiBedtimeSwitch(api, device, setting) for setting in settings}
+
+    # If no settings found, create a placeholder switch
+    if not switches:
+        _LOGGER.warning(
+            "No bedtime settings found for device %s, creating placeholder",
+            device.get("name", "Unknown Device"),
+        )
+        switches["placeholder"] = RemiBedtimeSwitch(api, device, None)
+    return switches
+
+
+@callback
+def _sync_switches(hass, api, device, switches, async_add_entities, settings):
+    """Add switches for new Events and retire those whose Event disappeared."""
+    current = {setting.get("objectId", "unknown"): setting for setting in settings}
+    if not current:
+        current = {"placeholder": None}
+    stale = [setting_id for setting_id in switches if setting_id not in current]
+    added = {setting_id: setting for setting_id, setting in current.items() if setting_id not in switches}
+    if not stale and not added:
+        return
+
+    entity_registry = er.async_get(hass)
+    for setting_id in stale:
+        switch = switches.pop(setting_id)
+        _LOGGER.info("Event %s of %s disappeared, removing its switch", setting_id, switch.name)
+        if switch.registry_entry is not None:
+            entity_registry.async_remove(switch.entity_id)
+        else:
+            hass.async_create_task(switch.async_remove())
+
+    new_switches = []
+    for setting_id, setting in added.items():
+        # Created from live data, unlike the switches of a restored snapshot
+        switches[setting_id] = RemiBedtimeSwitch(api, {**device, "restored": False}, setting)
+        new_switches.append(switches[setting_id])
+    if new_switches:
+        _LOGGER.info("Adding %d switch(es) for new Events of %s", len(new_switches), device.get("name"))
+        async_add_entities(new_switches)
+
+class RemiBedtimeSwitch(RemiEntity, SwitchEntity):
     """Representation of a Rémi bedtime/alarm setting switch."""
 
+    _listen_kind = KIND_EVENTS
+
     def __init__(self, api, device, setting):
         self._api = api
         self._device = device
@@ -79,9 +128,7 @@ class RemiBedtimeSwitch(SwitchEntity):
     def name(self):
         """Return the name of the switch."""
         name = f"Rémi {self._device_name} - {self._setting_name}"
-        if self._setting and self._setting.get("simulated"):
-            name += " (Simulated)"
-        elif self._setting and not self._setting.get("simulated"):
+        if self._setting:
             name += " (Event)"
         return name
 
@@ -107,10 +154,9 @@ class RemiBedtimeSwitch(SwitchEntity):
             "time": self._time,
             "days": self._days,
             "setting_id": self._setting_id,
+            **(super().extra_state_attributes or {}),
         }
-        if self._setting and self._setting.get("simulated"):
-            attrs["simulated"] = True
-        elif self._setting:
+        if self._setting:
             # Add additional Event-specific attributes
             attrs.update({
                 "recurrence": self._setting.get("recurrence", []),
@@ -132,6 +178,7 @@ class RemiBedtimeSwitch(SwitchEntity):
         try:
             await self._api.toggle_bedtime_setting(self._setting_id, True)
             self._is_on = True
+            self._reindex()
             _LOGGER.info("Turned on bedtime setting %s for %s", self._setting_name, self._device_name)
         except Exception as e:
             _LOGGER.error("Failed to turn on bedtime setting %s: %s", self._setting_name, e)
@@ -145,34 +192,20 @@ class RemiBedtimeSwitch(SwitchEntity):
         try:
             await self._api.toggle_bedtime_setting(self._setting_id, False)
             self._is_on = False
+            self._reindex()
             _LOGGER.info("Turned off bedtime setting %s for %s", self._setting_name, self._device_name)
         except Exception as e:
             _LOGGER.error("Failed to turn off bedtime setting %s: %s", self._setting_name, e)
 
-    async def async_update(self):
-        """Fetch the latest bedtime setting state from the API."""
+    def _apply_refresh(self, settings):
+        """Update the bedtime setting state from the device's latest Events."""
         if self._setting_id == "placeholder":
             return
-            
-        try:
-            # First try to get from cached data (from refresh service)
-            from homeassistant.core import HomeAssistant
-            hass = HomeAssistant.instance()
-            if hass and DOMAIN in hass.data and "bedtime_settings" in hass.data[DOMAIN]:
-                cached_settings = hass.data[DOMAIN]["bedtime_settings"].get(self._device_id, [])
-                for setting in cached_settings:
-                    if setting.get("objectId") == self._setting_id:
-                        self._update_from_setting(setting)
-                        return
-            
-            # Fallback to API call if no cached data
-            settings = await self._api.get_bedtime_settings(self._device_id)
-            for setting in settings:
-                if setting.get("objectId") == self._setting_id:
-                    self._update_from_setting(setting)
-                    break
-        except Exception as e:
-            _LOGGER.error("Failed to update bedtime setting %s: %s", self._setting_name, e)
+
+        for setting in settings:
+            if setting.get("objectId") == self._setting_id:
+                self._update_from_setting(setting)
+                break
 
     def _update_from_setting(self, setting):
         """Update entity state from setting data."""
@@ -187,3 +220,10 @@ class RemiBedtimeSwitch(SwitchEntity):
             old_name = self._setting_name
             self._setting_name = new_name
             _LOGGER.info("Updated setting name from app: '%s' -> '%s'", old_name, new_name)
+
+    def _reindex(self):
+        """Keep the integration's Event timeline in sync with this switch."""
+        if not self._setting or self.hass is None:
+            return
+        self._setting["enabled"] = self._is_on
+        self.hass.data[DOMAIN]["timeline"].update_event(self._device_id, self._setting)
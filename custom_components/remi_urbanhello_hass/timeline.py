@@ -0,0 +1,111 @@
+from bisect import bisect_right, insort
+from datetime import timedelta
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def _week_offset(moment):
+    """Return the number of minutes elapsed since Monday 00:00 for a datetime."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def _event_offsets(alarm):
+    """Expand an enabled alarm's weekly recurrence into minute-of-week offsets."""
+    if not alarm.get("enabled"):
+        return ()
+    event_time = alarm.get("event_time") or []
+    if len(event_time) < 2:
+        return ()
+    minute_of_day = event_time[0] * 60 + event_time[1]
+    recurrence = alarm.get("recurrence") or []
+    # Only weekly recurring events can be indexed; one-shot events have no day.
+    return tuple(
+        day * MINUTES_PER_DAY + minute_of_day
+        for day, enabled in enumerate(recurrence[:7])
+        if enabled
+    )
+
+
+class EventTimeline:
+    """Sorted index of upcoming Event occurrences across all Rémi clocks.
+
+    Occurrences are stored as minute-of-week offsets so a lookup is a single
+    bisection followed by a wrap-around walk, whatever the current week is.
+    """
+
+    def __init__(self):
+        self._entries = []  # (offset, device_id, event_id) pour tous les appareils
+        self._by_device = {}  # device_id -> [(offset, device_id, event_id)]
+        self._events = {}  # (device_id, event_id) -> (offsets, name)
+
+    def update_device(self, device_id, alarms):
+        """Replace the indexed events of a device, touching only those that changed."""
+        alarms = {alarm.get("objectId"): alarm for alarm in alarms if alarm.get("objectId")}
+        known = [event_id for (dev, event_id) in self._events if dev == device_id]
+        for event_id in known:
+            if event_id not in alarms:
+                self.remove_event(device_id, event_id)
+        for alarm in alarms.values():
+            self.update_event(device_id, alarm)
+
+    def update_event(self, device_id, alarm):
+        """Insert or refresh a single event of a device."""
+        event_id = alarm.get("objectId")
+        if not event_id:
+            return
+        offsets = _event_offsets(alarm)
+        name = alarm.get("name")
+        if self._events.get((device_id, event_id)) == (offsets, name):
+            return
+        self.remove_event(device_id, event_id)
+        if not offsets:
+            return
+        self._events[(device_id, event_id)] = (offsets, name)
+        device_entries = self._by_device.setdefault(device_id, [])
+        for offset in offsets:
+            insort(self._entries, (offset, device_id, event_id))
+            insort(device_entries, (offset, device_id, event_id))
+
+    def remove_event(self, device_id, event_id):
+        """Drop every occurrence of an event from the index."""
+        offsets, _name = self._events.pop((device_id, event_id), ((), None))
+        device_entries = self._by_device.get(device_id, [])
+        for offset in offsets:
+            self._entries.remove((offset, device_id, event_id))
+            device_entries.remove((offset, device_id, event_id))
+        if not device_entries:
+            self._by_device.pop(device_id, None)
+
+    def remove_device(self, device_id):
+        """Drop every event of a device from the index."""
+        for dev, event_id in [key for key in self._events if key[0] == device_id]:
+            self.remove_event(dev, event_id)
+
+    def next_event(self, device_id, now):
+        """Return the next occurrence for a device, or None if it has no enabled event."""
+        events = self.next_events(now, 1, device_id)
+        return events[0] if events else None
+
+    def next_events(self, now, count, device_id=None):
+        """Return the next ``count`` occurrences after ``now``, optionally for one device."""
+        if device_id is None:
+            entries = self._entries
+        else:
+            entries = self._by_device.get(device_id, [])
+        if not entries or count <= 0:
+            return []
+
+        week_start = (now - timedelta(minutes=_week_offset(now))).replace(second=0, microsecond=0)
+        start = bisect_right(entries, _week_offset(now), key=lambda entry: entry[0])
+        results = []
+        for position in range(start, start + count):
+            week, index = divmod(position, len(entries))
+            offset, dev, event_id = entries[index]
+            results.append({
+                "remi_id": dev,
+                "event_id": event_id,
+                "name": self._events[(dev, event_id)][1],
+                "time": week_start + timedelta(minutes=offset + week * MINUTES_PER_WEEK),
+            })
+        return results
@@ -0,0 +1,93 @@
+"""Payload bytes and decode time per poll, against the local fake Parse server.
+
+Usage: python tests/bench_payload.py [--polls N] [--clocks N] [--events N]
+
+A poll reads the info and the Events of every clock. Each configuration is
+measured on a fresh client: the baseline ignores the ``keys`` projection,
+sends uncompressed bodies and decodes them with the json module, like the
+client did before projections were added.
+
+Needs aiohttp (and orjson for the fast decode path), but not Home Assistant.
+"""
+import argparse
+import asyncio
+import importlib
+import importlib.util
+import json
+from pathlib import Path
+import sys
+import time
+
+from fake_parse import FakeParseServer
+
+COMPONENT_DIR = Path(__file__).resolve().parents[1] / "custom_components" / "remi_urbanhello_hass"
+
+CONFIGURATIONS = (
+    ("baseline", {"honor_keys": False, "compress": False, "fast_json": False}),
+    ("keys", {"honor_keys": True, "compress": False, "fast_json": False}),
+    ("keys+gzip", {"honor_keys": True, "compress": True, "fast_json": False}),
+    ("keys+gzip+orjson", {"honor_keys": True, "compress": True, "fast_json": True}),
+)
+
+
+def load_api_module():
+    """Import the integration's api module without its Home Assistant package __init__."""
+    package = "remi_urbanhello_hass"
+    spec = importlib.util.spec_from_loader(package, loader=None, is_package=True)
+    module = importlib.util.module_from_spec(spec)
+    module.__path__ = [str(COMPONENT_DIR)]
+    sys.modules[package] = module
+    return importlib.import_module(f"{package}.api")
+
+
+async def measure(api_module, polls, clocks, events, honor_keys, compress, fast_json):
+    server = FakeParseServer(clocks=clocks, events_per_clock=events, honor_keys=honor_keys, compress=compress)
+    await server.start()
+    fast_loads = api_module.json_loads
+    loads = fast_loads if fast_json else json.loads
+    decode = 0.0
+
+    def timed_loads(body):
+        nonlocal decode
+        start = time.perf_counter()
+        try:
+            return loads(body)
+        finally:
+            decode += time.perf_counter() - start
+
+    api_module.json_loads = timed_loads
+    api = api_module.RemiAPI("bench", "bench")
+    api.BASE_URL = server.url
+    api.cache_duration = 0
+    try:
+        await api.login()
+        server.reset_counters()
+        decode = 0.0
+        for _ in range(polls):
+            for remi_id in api.remis:
+                await api.get_remi_info(remi_id)
+                await api.get_bedtime_settings(remi_id)
+    finally:
+        api_module.json_loads = fast_loads
+        await api.close()
+        await server.stop()
+    return server.bytes_sent / polls, decode / polls * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--clocks", type=int, default=3)
+    parser.add_argument("--events", type=int, default=6)
+    args = parser.parse_args()
+
+    api_module = load_api_module()
+    print(f"{args.polls} polls of {args.clocks} clocks with {args.events} Events each")
+    print(f"{'configuration':<20}{'bytes/poll':>12}{'decode ms/poll':>16}")
+    for name, options in CONFIGURATIONS:
+        size, decode = await measure(api_module, args.polls, args.clocks, args.events, **options)
+        print(f"{name:<20}{size:>12.0f}{decode:>16.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
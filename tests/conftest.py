@@ -0,0 +1,30 @@
+"""Fixtures shared by the tests, run with pytest-homeassistant-custom-component."""
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+# custom_components et fake_parse importables quel que soit le répertoire de lancement
+for path in (ROOT, ROOT / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Let Home Assistant load the integration from custom_components."""
+    yield
+
+
+@pytest.fixture
+async def fake_parse(socket_enabled, monkeypatch):
+    """Start a local fake Parse server and point the integration at it."""
+    from custom_components.remi_urbanhello_hass.api import RemiAPI
+    from fake_parse import FakeParseServer
+
+    server = FakeParseServer()
+    await server.start()
+    monkeypatch.setattr(RemiAPI, "BASE_URL", server.url)
+    yield server
+    await server.stop()
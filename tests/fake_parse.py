@@ -0,0 +1,269 @@
+"""Local fake of the Rémi Parse server, for benchmarks and soak tests.
+
+It serves the subset of the Parse REST API the integration uses: login,
+object reads and writes, ``_method: GET`` queries (where, order, limit,
+keys) and ``/batch``. Objects carry the extra columns of the real backend
+so that key projections and compression have something to save.
+
+Failures can be injected: random 500s (``error_rate``), connections closed
+without an answer (``drop_rate``), a full outage (``outage``) and session
+expiry (``expire_sessions``).
+"""
+from datetime import datetime, timezone
+import gzip
+import json
+import random
+import secrets
+
+from aiohttp import web
+
+USER_ID = "fakeUser01"
+MOUNT = "/parse"
+FACE_NAMES = ("sleepyFace", "awakeFace", "blankFace", "semiAwakeFace", "smilyFace")
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _pointer(class_name, object_id):
+    return {"__type": "Pointer", "className": class_name, "objectId": object_id}
+
+
+def _comparable(value):
+    """Return a value comparable with Parse semantics (pointers by id, dates by iso)."""
+    if isinstance(value, dict):
+        if value.get("__type") == "Pointer":
+            return value["objectId"]
+        if value.get("__type") == "Date":
+            return value["iso"]
+    return value
+
+
+def _matches(obj, where):
+    for field, condition in (where or {}).items():
+        if field == "$and":
+            if not all(_matches(obj, clause) for clause in condition):
+                return False
+            continue
+        if field == "$or":
+            if not any(_matches(obj, clause) for clause in condition):
+                return False
+            continue
+        value = _comparable(obj.get(field))
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            for operator, operand in condition.items():
+                if operator == "$in":
+                    if value not in [_comparable(item) for item in operand]:
+                        return False
+                elif operator == "$gt":
+                    if value is None or not value > _comparable(operand):
+                        return False
+                elif operator == "$gte":
+                    if value is None or not value >= _comparable(operand):
+                        return False
+                elif operator == "$lt":
+                    if value is None or not value < _comparable(operand):
+                        return False
+                else:
+                    raise ValueError(f"Unsupported operator {operator}")
+        elif value != _comparable(condition):
+            return False
+    return True
+
+
+class FakeParseServer:
+    """In-process Parse server holding a few clocks, their Events and the Faces."""
+
+    def __init__(self, clocks=3, events_per_clock=4, honor_keys=True, compress=True, seed=0):
+        self.honor_keys = honor_keys
+        self.compress = compress
+        self.rng = random.Random(seed)
+        self.sessions = set()
+        self.bytes_sent = 0
+        self.requests = 0
+        self.logins = 0
+        self.failures = 0
+        self.error_rate = 0.0
+        self.drop_rate = 0.0
+        self.outage = False
+        self.url = None
+        self._runner = None
+        self.classes = {"Remi": {}, "Event": {}, "Face": {}}
+        for index, name in enumerate(FACE_NAMES):
+            self._insert("Face", {"name": name, "index": index, "image": "x" * 512})
+        faces = list(self.classes["Face"])
+        for index in range(clocks):
+            remi_id = self._insert("Remi", {
+                "name": f"Clock {index}",
+                "temp": 20,
+                "luminosity": 50,
+                "volume": 30,
+                "firmware_need_update": 0,
+                "current_firmware_version": "2.4.1",
+                "face": _pointer("Face", faces[1]),
+                "mac": "00:11:22:33:44:%02x" % index,
+                "wifi_ssid": "home",
+                "wifi_rssi": -55,
+                "timezone": "Europe/Paris",
+                "noise_history": [self.rng.randint(0, 90) for _ in range(96)],
+                "light_history": [self.rng.randint(0, 100) for _ in range(96)],
+            })
+            for event_index in range(events_per_clock):
+                self._insert("Event", {
+                    "remi": _pointer("Remi", remi_id),
+                    "name": f"Event {event_index}",
+                    "event_time": [6 + event_index * 4, 30],
+                    "enabled": event_index % 2 == 0,
+                    "recurrence": [1, 1, 1, 1, 1, 0, 0],
+                    "cmd": 1,
+                    "brightness": 60,
+                    "volume": 20,
+                    "length_min": 30,
+                    "face": _pointer("Face", faces[0]),
+                    "lightnight": [255, 128, 0],
+                    "sound": "lullaby",
+                    "sound_data": "x" * 256,
+                })
+
+    @property
+    def remi_ids(self):
+        return list(self.classes["Remi"])
+
+    def _insert(self, class_name, fields):
+        object_id = secrets.token_hex(5)
+        now = _now_iso()
+        self.classes[class_name][object_id] = {
+            **fields,
+            "objectId": object_id,
+            "createdAt": now,
+            "updatedAt": now,
+            "ACL": {USER_ID: {"read": True, "write": True}},
+        }
+        return object_id
+
+    def reset_counters(self):
+        self.bytes_sent = 0
+        self.requests = 0
+
+    def expire_sessions(self):
+        """Invalidate every session token, as the backend does when they expire."""
+        self.sessions.clear()
+
+    @web.middleware
+    async def _inject_failures(self, request, handler):
+        self.requests += 1
+        if self.outage or self.rng.random() < self.error_rate:
+            self.failures += 1
+            return self._error(request, 500, 1, "Internal server error")
+        if self.rng.random() < self.drop_rate:
+            self.failures += 1
+            # Fermer la connexion sans répondre
+            request.transport.close()
+            return web.Response(status=500)
+        return await handler(request)
+
+    async def start(self):
+        app = web.Application(middlewares=[self._inject_failures])
+        app.router.add_post(f"{MOUNT}/login", self._login)
+        app.router.add_post(f"{MOUNT}/batch", self._batch)
+        app.router.add_get(f"{MOUNT}/classes/{{class_name}}/{{object_id}}", self._get)
+        app.router.add_put(f"{MOUNT}/classes/{{class_name}}/{{object_id}}", self._put)
+        app.router.add_post(f"{MOUNT}/classes/{{class_name}}", self._query)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}{MOUNT}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _respond(self, request, data, status=200):
+        body = json.dumps(data).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.compress and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self.bytes_sent += len(body)
+        return web.Response(body=body, status=status, headers=headers)
+
+    def _error(self, request, status, code, message):
+        return self._respond(request, {"code": code, "error": message}, status)
+
+    def _authorized(self, request):
+        return request.headers.get("x-parse-session-token") in self.sessions
+
+    def _project(self, obj, keys):
+        if not keys or not self.honor_keys:
+            return dict(obj)
+        wanted = set(keys.split(",")) | {"objectId", "createdAt", "updatedAt"}
+        return {key: value for key, value in obj.items() if key in wanted}
+
+    def _run_query(self, class_name, body):
+        objects = [obj for obj in self.classes.get(class_name, {}).values() if _matches(obj, body.get("where"))]
+        if class_name == "Remi":
+            for obj in objects:
+                obj["updatedAt"] = _now_iso()
+        for field in reversed((body.get("order") or "").split(",")):
+            if field:
+                descending = field.startswith("-")
+                field = field.lstrip("-")
+                objects.sort(key=lambda obj: _comparable(obj.get(field)) or "", reverse=descending)
+        objects = objects[body.get("skip", 0):][:body.get("limit", 100)]
+        return {"results": [self._project(obj, body.get("keys")) for obj in objects]}
+
+    async def _login(self, request):
+        self.logins += 1
+        token = f"r:{secrets.token_hex(8)}"
+        self.sessions.add(token)
+        return self._respond(request, {
+            "objectId": USER_ID,
+            "username": "fake",
+            "sessionToken": token,
+            "remis": self.remi_ids,
+        })
+
+    async def _get(self, request):
+        if not self._authorized(request):
+            return self._error(request, 400, 209, "Invalid session token")
+        obj = self.classes.get(request.match_info["class_name"], {}).get(request.match_info["object_id"])
+        if obj is None:
+            return self._error(request, 404, 101, "Object not found.")
+        if request.match_info["class_name"] == "Remi":
+            # L'horloge remonte son état en continu
+            obj["updatedAt"] = _now_iso()
+        return self._respond(request, self._project(obj, request.query.get("keys")))
+
+    async def _put(self, request):
+        if not self._authorized(request):
+            return self._error(request, 400, 209, "Invalid session token")
+        obj = self.classes.get(request.match_info["class_name"], {}).get(request.match_info["object_id"])
+        if obj is None:
+            return self._error(request, 404, 101, "Object not found.")
+        obj.update(await request.json())
+        obj["updatedAt"] = _now_iso()
+        return self._respond(request, {"updatedAt": obj["updatedAt"]})
+
+    async def _query(self, request):
+        if not self._authorized(request):
+            return self._error(request, 400, 209, "Invalid session token")
+        class_name = request.match_info["class_name"]
+        if class_name not in self.classes:
+            return self._error(request, 400, 119, f"Class {class_name} does not exist")
+        return self._respond(request, self._run_query(class_name, await request.json()))
+
+    async def _batch(self, request):
+        if not self._authorized(request):
+            return self._error(request, 400, 209, "Invalid session token")
+        responses = []
+        for sub in (await request.json())["requests"]:
+            class_name = sub["path"].rsplit("/", 1)[1]
+            if class_name not in self.classes:
+                responses.append({"error": {"code": 119, "error": f"Class {class_name} does not exist"}})
+            else:
+                responses.append({"success": self._run_query(class_name, sub.get("body", {}))})
+        return self._respond(request, responses)
@@ -0,0 +1,189 @@
+"""Soak test: many simulated hours of the integration against the fake Parse server.
+
+Time is accelerated: the poller runs one interval every SIM_MINUTE real
+seconds instead of every 60 s, and the backoff and replay delays are
+scaled down by the same factor. Every simulated hour:
+
+* the backend expires all session tokens;
+* random requests fail with a 500 or a dropped connection, and some hours
+  start with a 10 minute cloud outage (writes are queued and replayed);
+* lights fade, numbers and switches are set, the services are called;
+* every few hours the entry is reloaded.
+
+After each hour the test samples the memory allocated by the integration
+and aiohttp (tracemalloc), the open file descriptors, the unclosed
+aiohttp client sessions and the pending asyncio tasks. It fails when any
+of them trends upward once warmed up.
+
+REMI_SOAK_HOURS sets the number of simulated hours (default 8, about a
+minute of real time).
+"""
+import asyncio
+from functools import partial
+import gc
+import logging
+import os
+from pathlib import Path
+import random
+import statistics
+import tracemalloc
+
+import aiohttp
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.remi_urbanhello_hass import command_queue, poller
+from custom_components.remi_urbanhello_hass.const import DOMAIN
+from custom_components.remi_urbanhello_hass.poller import RemiPoller
+
+SOAK_HOURS = int(os.environ.get("REMI_SOAK_HOURS", "8"))
+WARMUP_HOURS = 2
+# Secondes réelles par minute simulée (un intervalle de poll)
+SIM_MINUTE = 0.1
+SPEEDUP = 60 / SIM_MINUTE
+
+COMPONENT_DIR = Path(poller.__file__).parent
+AIOHTTP_DIR = Path(aiohttp.__file__).parent
+
+# Hausse tolérée entre le début et la fin de la période mesurée
+TOLERANCES = {
+    "memory_bytes": 256 * 1024,
+    "open_fds": 2,
+    "open_sessions": 0,
+    "pending_tasks": 3,
+}
+
+
+def _sample():
+    """Return the resource counters tracked by the soak test."""
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(True, f"{COMPONENT_DIR}{os.sep}*"),
+        tracemalloc.Filter(True, f"{AIOHTTP_DIR}{os.sep}*"),
+    ])
+    fd_dir = Path("/proc/self/fd")
+    return {
+        "memory_bytes": sum(stat.size for stat in snapshot.statistics("filename")),
+        "open_fds": len(os.listdir(fd_dir)) if fd_dir.exists() else 0,
+        "open_sessions": sum(
+            1 for obj in gc.get_objects()
+            if isinstance(obj, aiohttp.ClientSession) and not obj.closed
+        ),
+        "pending_tasks": len(asyncio.all_tasks()),
+    }, snapshot
+
+
+def _assert_no_upward_trend(samples, first_snapshot, last_snapshot):
+    """Fail when the second half of the samples sits above the first half."""
+    half = len(samples) // 2
+    problems = []
+    for name, tolerance in TOLERANCES.items():
+        series = [sample[name] for sample in samples]
+        before = statistics.median(series[:half])
+        after = statistics.median(series[half:])
+        if after > before + tolerance and series[-1] > series[0]:
+            problems.append(f"{name} grew from {before} to {after}: {series}")
+    if problems:
+        growth = "\n".join(
+            str(stat) for stat in last_snapshot.compare_to(first_snapshot, "lineno")[:15]
+        )
+        raise AssertionError("\n".join(problems) + f"\nTop allocation growth:\n{growth}")
+
+
+async def _call(hass, domain, service, data, **kwargs):
+    """Call a service like a user would; cloud errors surface as exceptions."""
+    try:
+        return await hass.services.async_call(domain, service, data, blocking=True, **kwargs)
+    except Exception as e:  # noqa: BLE001 - l'API lève des Exception génériques
+        logging.getLogger(__name__).debug("%s.%s failed: %s", domain, service, e)
+        return None
+
+
+async def _user_action(hass, rng):
+    lights = hass.states.async_entity_ids("light")
+    numbers = hass.states.async_entity_ids("number")
+    switches = [
+        entity_id for entity_id in hass.states.async_entity_ids("switch")
+        if hass.states.get(entity_id).state in ("on", "off")
+    ]
+    action = rng.randrange(6)
+    if action == 0 and lights:
+        await _call(hass, "light", "turn_on", {
+            "entity_id": rng.choice(lights), "brightness": rng.randint(1, 255), "transition": 0.3,
+        })
+    elif action == 1 and lights:
+        await _call(hass, "light", "turn_off", {"entity_id": rng.choice(lights), "transition": 0.2})
+    elif action == 2 and numbers:
+        await _call(hass, "number", "set_value", {"entity_id": rng.choice(numbers), "value": rng.randint(0, 100)})
+    elif action == 3 and switches:
+        await _call(hass, "switch", "toggle", {"entity_id": rng.choice(switches)})
+    elif action == 4:
+        await _call(hass, DOMAIN, "refresh_data", {})
+    else:
+        await _call(hass, DOMAIN, "get_next_events", {"count": 5}, return_response=True)
+
+
+async def _simulate_hour(hass, server, rng, hour):
+    server.expire_sessions()
+    if hour % 4 == 3:
+        server.outage = True
+    for minute in range(0, 60, 5):
+        if minute == 10:
+            server.outage = False
+        await _user_action(hass, rng)
+        await asyncio.sleep(5 * SIM_MINUTE)
+
+
+async def test_soak(hass, fake_parse, monkeypatch):
+    """Run the integration for SOAK_HOURS simulated hours and check for leaks."""
+    fake_parse.error_rate = 0.03
+    fake_parse.drop_rate = 0.01
+    monkeypatch.setattr(
+        "custom_components.remi_urbanhello_hass.RemiPoller", partial(RemiPoller, interval=SIM_MINUTE)
+    )
+    monkeypatch.setattr(poller, "MAX_BACKOFF", poller.MAX_BACKOFF / SPEEDUP)
+    monkeypatch.setattr(command_queue, "REPLAY_RETRY_MIN", command_queue.REPLAY_RETRY_MIN / SPEEDUP)
+    monkeypatch.setattr(command_queue, "REPLAY_RETRY_MAX", command_queue.REPLAY_RETRY_MAX / SPEEDUP)
+    monkeypatch.setattr(command_queue, "COMMAND_MAX_AGE", command_queue.COMMAND_MAX_AGE / SPEEDUP)
+    # Les journaux capturés par pytest ne doivent pas compter comme une fuite
+    for name in ("aiohttp.access", "custom_components.remi_urbanhello_hass"):
+        monkeypatch.setattr(logging.getLogger(name), "level", logging.ERROR)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="fakeUser01", data={"username": "soak", "password": "soak"}
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    rng = random.Random(1)
+    tracemalloc.start()
+    samples = []
+    snapshots = []
+    try:
+        for hour in range(SOAK_HOURS):
+            if hour and hour % 3 == 0:
+                await hass.config_entries.async_reload(entry.entry_id)
+                await hass.async_block_till_done()
+            await _simulate_hour(hass, fake_parse, rng, hour)
+            if hour + 1 >= WARMUP_HOURS:
+                sample, snapshot = _sample()
+                samples.append(sample)
+                snapshots.append(snapshot)
+    finally:
+        tracemalloc.stop()
+        fake_parse.outage = False
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    # Le scénario a bien exercé les reconnexions et les pannes
+    assert fake_parse.logins > SOAK_HOURS
+    assert fake_parse.failures > 0
+    assert len(hass.states.async_entity_ids("light")) == len(fake_parse.remi_ids)
+
+    _assert_no_upward_trend(samples, snapshots[0], snapshots[-1])
+
+    # Après le déchargement, plus aucune session HTTP ouverte
+    gc.collect()
+    assert not [
+        obj for obj in gc.get_objects() if isinstance(obj, aiohttp.ClientSession) and not obj.closed
+    ]